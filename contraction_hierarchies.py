@@ -0,0 +1,315 @@
+import logging
+import os
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ContractionHierarchy:
+    """Customizable Contraction Hierarchies over a RoutingGraph with bidirectional upward search.
+
+    The contraction order comes from geometric nested dissection, so it only depends on the road
+    layout. Every shortcut of that order is kept (no witness search): node pair k (lo, hi) has an
+    upward arc 2k (lo -> hi) and a downward arc 2k+1 (hi -> lo). A lower triangle of a pair is a
+    lower-ranked node z adjacent to both ends; customizing takes, per arc, the minimum of its own
+    edge weight and the detours through all of its lower triangles, lowest pairs first. The
+    result is exact for any edge weights, so traffic updates only need weights_for().
+    """
+
+    def __init__(self, rank, pair_lo, pair_hi, edge_pair, tri_pair, tri_lo, tri_hi, level_offsets, signature):
+        self.rank = np.asarray(rank, dtype=np.int32)
+        self.pair_lo = np.asarray(pair_lo, dtype=np.int32)
+        self.pair_hi = np.asarray(pair_hi, dtype=np.int32)
+        self.edge_pair = np.asarray(edge_pair, dtype=np.int64)  # pasangan per edge asli, -1 untuk self-loop
+        # Segitiga bawah: pasangan (x, y) lewat z, dengan tri_lo = pasangan (z, x) dan tri_hi = pasangan (z, y)
+        self.tri_pair = np.asarray(tri_pair, dtype=np.int32)
+        self.tri_lo = np.asarray(tri_lo, dtype=np.int32)
+        self.tri_hi = np.asarray(tri_hi, dtype=np.int32)
+        self.level_offsets = np.asarray(level_offsets, dtype=np.int64)
+        self.signature = int(signature)
+
+        n, pairs = len(self.rank), len(self.pair_lo)
+        self.arc_src = np.empty(2 * pairs, dtype=np.int32)
+        self.arc_dst = np.empty(2 * pairs, dtype=np.int32)
+        self.arc_src[0::2], self.arc_dst[0::2] = self.pair_lo, self.pair_hi
+        self.arc_src[1::2], self.arc_dst[1::2] = self.pair_hi, self.pair_lo
+        valid = self.edge_pair >= 0
+        self._edge_ids = np.flatnonzero(valid)
+        self._edge_arcs = np.empty(0, dtype=np.int64)
+        # Segitiga urut per (tingkat, pasangan), jadi segitiga satu pasangan bersebelahan
+        first = np.flatnonzero(np.diff(self.tri_pair, prepend=-1) != 0)
+        self.tri_first = np.zeros(pairs, dtype=np.int64)
+        self.tri_first[self.tri_pair[first]] = first
+        self.tri_count = np.bincount(self.tri_pair, minlength=pairs)
+        self.arc_weight, self.arc_edge = np.zeros(2 * pairs), np.full(2 * pairs, -1, dtype=np.int64)
+
+        # Pasangan dikelompokkan per node bawah: arc naik 2k untuk pencarian maju, 2k+1 (dibalik) untuk mundur
+        offsets, pairs_by_lo = self._group(self.pair_lo, np.arange(pairs, dtype=np.int64), n)
+        self._pair_offsets = offsets.tolist()
+        self._arcs_by_lo = (2 * pairs_by_lo, 2 * pairs_by_lo + 1)
+        self._heads_by_lo = self.pair_hi[pairs_by_lo].astype(np.int64)
+        # Induk di pohon eliminasi = tetangga atas dengan peringkat terendah; ruang pencarian = leluhur node
+        self.parent = np.full(n, -1, dtype=np.int64)
+        by_rank = np.lexsort((self.rank[self.pair_hi], self.pair_lo))
+        lowest = by_rank[np.flatnonzero(np.diff(self.pair_lo[by_rank], prepend=-1) != 0)]
+        self.parent[self.pair_lo[lowest]] = self.pair_hi[lowest]
+        self._parent_list = self.parent.tolist()
+
+    @staticmethod
+    def _group(keys, arcs, n):
+        order = np.argsort(keys, kind='stable')
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=n), out=offsets[1:])
+        return offsets, arcs[order]
+
+    def _bind_edges(self, graph):
+        # Arc untuk tiap edge asli: naik bila ekor edge lebih rendah peringkatnya dari kepalanya
+        edges = self._edge_ids
+        pair = self.edge_pair[edges]
+        downward = self.rank[graph.sources[edges]] > self.rank[graph.targets[edges]]
+        self._edge_arcs = 2 * pair + downward
+
+    @staticmethod
+    def _dissection_order(graph, leaf_size):
+        """Nested dissection on projected coordinates: halves first, their separator ranked above both"""
+        mask = graph.sources != graph.targets
+        eu, ev = graph.sources[mask].astype(np.int64), graph.targets[mask].astype(np.int64)
+        side = np.zeros(graph.num_nodes, dtype=np.int8)
+        in_separator = np.zeros(graph.num_nodes, dtype=bool)
+        order = []
+
+        def dissect(nodes, eu, ev):
+            if len(nodes) <= leaf_size or len(eu) == 0:
+                order.append(nodes)
+                return
+            xs, ys = graph.px[nodes], graph.py[nodes]
+            separator = None
+            # Potong menurut sumbu x, y dan kedua diagonal; ambil separator terkecil
+            for coord in (xs, ys, xs + ys, xs - ys):
+                half = np.argsort(coord, kind='stable')[:len(nodes) // 2]
+                side[nodes] = 1
+                side[nodes[half]] = 0
+                cross = side[eu] != side[ev]
+                ends = np.unique(np.concatenate((eu[cross], ev[cross])))
+                left_ends, right_ends = ends[side[ends] == 0], ends[side[ends] == 1]
+                candidate = left_ends if len(left_ends) <= len(right_ends) else right_ends
+                if separator is None or len(candidate) < len(separator):
+                    separator, best_half = candidate, half
+            side[nodes] = 1
+            side[nodes[best_half]] = 0
+            in_separator[separator] = True
+            keep = ~(in_separator[eu] | in_separator[ev])
+            children = []
+            for s in (0, 1):
+                part = nodes[(side[nodes] == s) & ~in_separator[nodes]]
+                inside = keep & (side[eu] == s)
+                children.append((part, eu[inside], ev[inside]))
+            for part, cu, cv in children:
+                dissect(part, cu, cv)
+            order.append(separator)
+
+        dissect(np.arange(graph.num_nodes, dtype=np.int64), eu, ev)
+        return np.concatenate(order) if order else np.array([], dtype=np.int64)
+
+    @classmethod
+    def build(cls, graph, leaf_size=16):
+        """Order the nodes, contract them keeping every shortcut, and return the customized hierarchy"""
+        n = graph.num_nodes
+        order = cls._dissection_order(graph, leaf_size)
+        rank = np.empty(n, dtype=np.int32)
+        rank[order] = np.arange(n, dtype=np.int32)
+
+        upper = [set() for _ in range(n)]  # tetangga dengan peringkat lebih tinggi
+        for u, v in zip(graph.sources.tolist(), graph.targets.tolist()):
+            if u != v:
+                lo, hi = (u, v) if rank[u] < rank[v] else (v, u)
+                upper[lo].add(hi)
+
+        # Kontraksi simbolik: tetangga atas sebuah node saling terhubung (fill-in)
+        rank_list = rank.tolist()
+        upper_sorted = [None] * n
+        for v in order.tolist():
+            above = sorted(upper[v], key=rank_list.__getitem__)
+            upper_sorted[v] = above
+            for i, x in enumerate(above):
+                upper[x].update(above[i + 1:])
+            if (rank_list[v] + 1) % 5000 == 0:
+                logging.info(f"⏳ Contraction Hierarchies: {rank_list[v] + 1}/{n} node dikontraksi")
+
+        pair_of = [dict() for _ in range(n)]
+        pair_lo, pair_hi = [], []
+        height = [0] * n  # tinggi di pohon eliminasi; pasangan dikustomisasi per tinggi node bawahnya
+        for v in order.tolist():
+            for x in upper_sorted[v]:
+                pair_of[v][x] = len(pair_lo)
+                pair_lo.append(v)
+                pair_hi.append(x)
+                if height[x] <= height[v]:
+                    height[x] = height[v] + 1
+
+        tri_pair, tri_lo, tri_hi, tri_level = [], [], [], []
+        for z in order.tolist():
+            above = upper_sorted[z]
+            below = pair_of[z]
+            for i, x in enumerate(above):
+                of_x, zx, level = pair_of[x], below[x], height[x]
+                for y in above[i + 1:]:
+                    tri_pair.append(of_x[y])
+                    tri_lo.append(zx)
+                    tri_hi.append(below[y])
+                    tri_level.append(level)
+
+        tri_pair, tri_lo, tri_hi = np.array(tri_pair, dtype=np.int64), np.array(tri_lo), np.array(tri_hi)
+        tri_level = np.array(tri_level, dtype=np.int64)
+        by_level = np.lexsort((tri_pair, tri_level))
+        levels = int(tri_level.max()) + 1 if len(tri_level) else 0
+        level_offsets = np.zeros(levels + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tri_level, minlength=levels), out=level_offsets[1:])
+
+        edge_pair = np.full(graph.num_edges, -1, dtype=np.int64)
+        for e, (u, v) in enumerate(zip(graph.sources.tolist(), graph.targets.tolist())):
+            if u != v:
+                edge_pair[e] = pair_of[u][v] if rank_list[u] < rank_list[v] else pair_of[v][u]
+
+        ch = cls(rank, pair_lo, pair_hi, edge_pair, tri_pair[by_level], tri_lo[by_level], tri_hi[by_level],
+                 level_offsets, graph.signature())
+        ch._bind_edges(graph)
+        ch.customize(graph.weight)
+        logging.info(f"✅ Contraction Hierarchies dibangun: {n} node, {len(pair_lo) * 2} arc, "
+                     f"{len(tri_pair)} segitiga")
+        return ch
+
+    def customize(self, weight):
+        """Make weight the hierarchy's default metric for shortest_path"""
+        self.arc_weight, self.arc_edge = self.weights_for(weight)
+
+    def weights_for(self, weight):
+        """(arc weights, original edge per arc) for edge weights, exact for any non-negative weights.
+
+        arc_edge is -1 where a lower triangle beats the arc's own edge; the path through that arc is
+        then unpacked from the triangle. The hierarchy's own arc weights are left untouched.
+        """
+        arc_weight = np.full(len(self.arc_src), np.inf)
+        edges, arcs = self._edge_ids, self._edge_arcs
+        edge_weight = weight[edges]
+        np.minimum.at(arc_weight, arcs, edge_weight)
+        arc_edge = np.full(len(self.arc_src), -1, dtype=np.int64)
+        best = edge_weight == arc_weight[arcs]
+        arc_edge[arcs[best]] = edges[best]
+        own = arc_weight.copy()
+
+        up, down = arc_weight[0::2], arc_weight[1::2]  # view: pasangan k -> arc 2k dan 2k+1
+        for a, b in zip(self.level_offsets[:-1].tolist(), self.level_offsets[1:].tolist()):
+            pair, lo, hi = self.tri_pair[a:b], self.tri_lo[a:b], self.tri_hi[a:b]
+            # x -> y lewat z: (x -> z) + (z -> y); y -> x lewat z: (y -> z) + (z -> x)
+            np.minimum.at(up, pair, down[lo] + up[hi])
+            np.minimum.at(down, pair, down[hi] + up[lo])
+        arc_edge[arc_weight < own] = -1
+        return arc_weight, arc_edge
+
+    def save(self, path):
+        np.savez(path, rank=self.rank, pair_lo=self.pair_lo, pair_hi=self.pair_hi, edge_pair=self.edge_pair,
+                 tri_pair=self.tri_pair, tri_lo=self.tri_lo, tri_hi=self.tri_hi, level_offsets=self.level_offsets,
+                 signature=np.int64(self.signature))
+        logging.info(f"✅ Contraction Hierarchies disimpan ke {path}")
+
+    @classmethod
+    def load(cls, path, graph):
+        """Load a saved hierarchy; returns None if it was built for a different graph or format"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if ('tri_pair' not in data or int(data['signature']) != graph.signature()
+                    or len(data['rank']) != graph.num_nodes):
+                logging.warning(f"⚠ {path} tidak cocok dengan graf saat ini, akan dibangun ulang")
+                return None
+            ch = cls(data['rank'], data['pair_lo'], data['pair_hi'], data['edge_pair'], data['tri_pair'],
+                     data['tri_lo'], data['tri_hi'], data['level_offsets'], data['signature'])
+        ch._bind_edges(graph)
+        ch.customize(graph.weight)
+        logging.info(f"✅ Loaded Contraction Hierarchies from {path}")
+        return ch
+
+    def _unpack(self, arc, arc_weight, arc_edge, edges):
+        stack = [arc]
+        while stack:
+            a = stack.pop()
+            if arc_edge[a] >= 0:
+                edges.append(int(arc_edge[a]))
+                continue
+            pair, downward = divmod(a, 2)
+            start = int(self.tri_first[pair])
+            for t in range(start, start + int(self.tri_count[pair])):
+                lo, hi = int(self.tri_lo[t]), int(self.tri_hi[t])
+                # Naik x -> z -> y, turun y -> z -> x
+                first, second = (2 * hi + 1, 2 * lo) if downward else (2 * lo + 1, 2 * hi)
+                if arc_weight[first] + arc_weight[second] == arc_weight[a]:
+                    stack.append(second)
+                    stack.append(first)
+                    break
+            else:
+                raise ValueError(f"arc {a} tidak bisa diurai dari bobot yang diberikan")
+
+    def _ancestors(self, node):
+        nodes, parent = [], self._parent_list
+        while node >= 0:
+            nodes.append(node)
+            node = parent[node]
+        return nodes
+
+    def shortest_path(self, graph, source, target, customized=None):
+        """Elimination-tree query; same return shape as RoutingGraph.shortest_path.
+
+        The upward search space of a node is exactly its ancestors in the elimination tree, so both
+        sides scan their ancestors bottom-up without a priority queue and meet at the cheapest
+        common ancestor. customized is a weights_for() result; the hierarchy's own metric is used
+        when omitted.
+        """
+        arc_weight, arc_edge = (self.arc_weight, self.arc_edge) if customized is None else customized
+        if source == target:
+            return np.array([source], dtype=np.int64), np.array([], dtype=np.int64), 0.0
+        n = len(self.rank)
+        dist = (np.full(n, np.inf), np.full(n, np.inf))
+        pred = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+        ancestors = (self._ancestors(source), self._ancestors(target))
+        for side, start in ((0, source), (1, target)):
+            d, p = dist[side], pred[side]
+            d[start] = 0.0
+            arcs_by_lo, offsets = self._arcs_by_lo[side], self._pair_offsets
+            for u in ancestors[side]:
+                du = d[u]
+                a, b = offsets[u], offsets[u + 1]
+                if du == np.inf or a == b:
+                    continue
+                arcs, heads = arcs_by_lo[a:b], self._heads_by_lo[a:b]
+                candidate = arc_weight[arcs]
+                candidate += du
+                better = candidate < d[heads]
+                d[heads[better]] = candidate[better]
+                p[heads[better]] = arcs[better]
+
+        common = np.array(ancestors[0], dtype=np.int64)
+        total = dist[0][common] + dist[1][common]
+        meeting = int(common[np.argmin(total)])
+        best = float(total.min())
+        if best == np.inf:
+            return None, None, np.inf
+        up_arcs = []
+        node = meeting
+        while node != source:
+            arc = int(pred[0][node])
+            up_arcs.append(arc)
+            node = int(self.arc_src[arc])
+        up_arcs.reverse()
+        node = meeting
+        while node != target:
+            arc = int(pred[1][node])
+            up_arcs.append(arc)
+            node = int(self.arc_dst[arc])
+
+        edges = []
+        for arc in up_arcs:
+            self._unpack(arc, arc_weight, arc_edge, edges)
+        edges = np.array(edges, dtype=np.int64)
+        nodes = np.concatenate(([source], graph.targets[edges])).astype(np.int64)
+        return nodes, edges, best
@@ -0,0 +1,73 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+WEB_MERCATOR_M_PER_PIXEL = 156543.03392  # meter per piksel di khatulistiwa pada zoom 0
+
+
+def tolerance_for_zoom(zoom, latitude, pixels=1.0):
+    """Ground distance (m) covered by `pixels` screen pixels at a Web Mercator zoom level"""
+    return WEB_MERCATOR_M_PER_PIXEL * np.cos(np.radians(latitude)) / 2 ** zoom * pixels
+
+
+def douglas_peucker(points, tolerance):
+    """Boolean mask of the points Douglas-Peucker keeps for an (n, 2) array in metres"""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        inner = points[first + 1:last]
+        segment = end - start
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0] - start[0], inner[:, 1] - start[1])
+        else:
+            distances = np.abs(segment[0] * (inner[:, 1] - start[1]) - segment[1] * (inner[:, 0] - start[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def simplify_coordinates(coordinates, tolerance_m):
+    """Douglas-Peucker on (lat, lon) coordinates with a tolerance in metres"""
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+    if len(coords) < 3 or tolerance_m <= 0:
+        return coords
+    lat0 = np.radians(coords[:, 0].mean())
+    projected = np.column_stack((np.radians(coords[:, 1]) * np.cos(lat0), np.radians(coords[:, 0]))) * EARTH_RADIUS_M
+    return coords[douglas_peucker(projected, tolerance_m)]
+
+
+def encode_polyline(coordinates, precision=5):
+    """Google encoded polyline for a sequence of (lat, lon)"""
+    points = np.round(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2) * 10 ** precision).astype(np.int64)
+    if len(points) == 0:
+        return ""
+    deltas = np.diff(points, axis=0, prepend=[[0, 0]]).ravel()
+    chunks = []
+    for value in ((deltas << 1) ^ (deltas >> 63)).tolist():
+        while value >= 0x20:
+            chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chunks.append(chr(value + 63))
+    return "".join(chunks)
+
+
+def to_geojson(coordinates, properties=None, precision=5):
+    """GeoJSON LineString Feature ([lon, lat] order) for (lat, lon) coordinates"""
+    coords = np.round(np.asarray(coordinates, dtype=np.float64).reshape(-1, 2), precision)
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'LineString', 'coordinates': coords[:, ::-1].tolist()},
+        'properties': properties or {},
+    }
@@ -8,6 +8,7 @@ import webbrowser
 import os
 import logging
 from threads import RouteCalculationThread
+from map_layers import RouteLayerScript
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -24,6 +25,9 @@ class DataUpdateThread(QThread):
         try:
             data = self.traffic_system.generate_enhanced_bengkulu_data(30)
             self.route_engine.update_traffic_conditions(data)
+            if self.route_engine.time_profiles is None:
+                # Belum ada profil tersimpan: pelajari dari data pertama, lalu dimuat dari berkas saat start berikutnya
+                self.route_engine.learn_time_profiles(data)
             self.data_updated.emit(data)
         except Exception as e:
             self.error_occurred.emit(str(e))
@@ -67,6 +71,9 @@ class TrafficMonitoringGUI(QMainWindow):
         self.data_thread = None
         self.map_thread = None
         self.route_map_paths = {}  # Menyimpan path peta untuk setiap rute
+        self.route_template_path = None  # Halaman peta dasar; rute ditampilkan sebagai layer lewat runJavaScript
+        self.route_template_state = None  # None, 'loading' atau 'ready'
+        self.pending_route_layers = None
         self.route_tab_layout = None  # Menyimpan referensi layout tab Rekomendasi Rute
         self.init_ui()
         self.start_data_update()
@@ -308,6 +315,7 @@ class TrafficMonitoringGUI(QMainWindow):
         # Atur ukuran peta lebih besar
         self.map_widget = QWebEngineView()
         self.map_widget.setMinimumSize(1000, 500)  # Tingkatkan ukuran minimum peta
+        self.map_widget.loadFinished.connect(self.on_map_load_finished)
         self.route_tab_layout.addWidget(self.map_widget)
         
         self.cari_lagi_btn = QPushButton("Cari Rute Lagi")
@@ -532,24 +540,24 @@ class TrafficMonitoringGUI(QMainWindow):
             logging.error(f"❌ No routes found for mode {mode} despite calculation")
             return
         
-        # Buat peta untuk setiap rute dan isi dropdown
-        self.route_combo.clear()
+        # Semua rute dikirim sebagai layer ke satu halaman peta; tidak ada file HTML per rute
         self.route_map_paths.clear()
-        for i, route in enumerate(filtered_routes, 1):
+        try:
+            route_layers = self.route_engine.route_layer_payload(filtered_routes)
+        except Exception as e:
+            logging.error(f"❌ Failed to prepare route layers: {str(e)}")
+            route_layers = []
+        self.route_combo.blockSignals(True)
+        self.route_combo.clear()
+        for i, route in enumerate(filtered_routes[:len(route_layers)], 1):
             route_label = f"Rute {'Utama' if i == 1 else f'Alternatif {i-1}'} ({route['total_distance']:.2f} km, {route['estimated_time']:.2f} menit)"
             self.route_combo.addItem(route_label, i)
-            map_filename = f"rute_{start_loc.replace(' ', '_')}_{end_loc.replace(' ', '_')}_{mode}_{i}.html"
-            map_path = self.route_engine.create_route_map(route, map_filename, idx=i)
-            if map_path:
-                self.route_map_paths[i] = map_path
-                logging.info(f"✅ Map generated for route {i}: {map_path}")
-            else:
-                logging.error(f"❌ Failed to generate map for route {i}: {start_loc} to {end_loc}")
+            self.route_map_paths[i] = i - 1  # indeks layer di halaman peta
+        self.route_combo.blockSignals(False)
         
-        # Aktifkan dropdown hanya jika ada setidaknya satu peta yang berhasil dibuat
-        if self.route_map_paths:
+        # Aktifkan dropdown hanya jika ada setidaknya satu rute yang bisa digambar
+        if self.route_map_paths and self.show_route_layers(route_layers):
             self.route_combo.setEnabled(True)
-            self.map_widget.setUrl(QUrl.fromLocalFile(self.route_map_paths[1]))  # Tampilkan rute utama secara default
             
             # Tambahkan label untuk detail rute
             route_details = QLabel(self)
@@ -585,7 +593,7 @@ class TrafficMonitoringGUI(QMainWindow):
             """
             route_details.setText(html_text)
             self.route_tab_layout.insertWidget(self.route_tab_layout.count() - 3, route_details)  # Gunakan self.route_tab_layout
-            logging.info(f"✅ Default map loaded from {self.route_map_paths[1]}")
+            logging.info(f"✅ {len(route_layers)} route layers sent to the map")
         else:
             self.map_widget.setHtml("<h3>❌ Gagal membuat peta untuk semua rute</h3>")
             self.route_combo.setEnabled(False)
@@ -595,14 +603,43 @@ class TrafficMonitoringGUI(QMainWindow):
         self.cari_lagi_btn.show()
         self.selesai_btn.show()
         
+    def show_route_layers(self, route_layers):
+        """Draw routes on the template page, loading it first if it isn't shown yet"""
+        if not route_layers:
+            return False
+        if self.route_template_state == 'ready':
+            self.map_widget.page().runJavaScript(f"setRoutes({RouteLayerScript.to_js(route_layers)});")
+            return True
+        if self.route_template_path is None:
+            self.route_template_path = self.route_engine.create_route_map_template()
+            if not self.route_template_path:
+                return False
+        self.pending_route_layers = route_layers
+        self.route_template_state = 'loading'
+        self.map_widget.setUrl(QUrl.fromLocalFile(self.route_template_path))
+        return True
+        
+    def on_map_load_finished(self, ok):
+        if self.route_template_state != 'loading':
+            # Halaman lain (pesan error, dsb.) menggantikan template
+            self.route_template_state = None
+            return
+        self.route_template_state = 'ready' if ok else None
+        if ok and self.pending_route_layers:
+            self.map_widget.page().runJavaScript(f"setRoutes({RouteLayerScript.to_js(self.pending_route_layers)});")
+        elif not ok:
+            logging.error(f"❌ Failed to load route map template {self.route_template_path}")
+        self.pending_route_layers = None
+        
     def update_route_map(self, index):
         route_idx = self.route_combo.itemData(index)
-        if route_idx in self.route_map_paths:
-            self.map_widget.setUrl(QUrl.fromLocalFile(self.route_map_paths[route_idx]))
-            logging.info(f"✅ Switched to map: {self.route_map_paths[route_idx]}")
-        else:
+        if route_idx in self.route_map_paths and self.route_template_state == 'ready':
+            # Hanya visibilitas layer yang berubah; halaman tidak dimuat ulang
+            self.map_widget.page().runJavaScript(f"showRoute({self.route_map_paths[route_idx]});")
+            logging.info(f"✅ Switched to route layer {route_idx}")
+        elif route_idx is not None and route_idx not in self.route_map_paths:
             self.map_widget.setHtml("<h3>❌ Peta rute tidak tersedia</h3>")
-            logging.error(f"❌ No map path for route index {route_idx}")
+            logging.error(f"❌ No map layer for route index {route_idx}")
         
     def on_route_error(self, error, progress):
         progress.close()
@@ -0,0 +1,86 @@
+import logging
+import os
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class Landmarks:
+    """ALT (A*, landmarks, triangle inequality) lower bounds for a RoutingGraph.
+
+    distances is node-major: distances[v, :L] holds the free-flow cost from each landmark to v
+    and distances[v, L:] minus the cost from v to each landmark, both on base_weight (NaN where
+    a landmark is unreachable). By the triangle inequality
+        d(v, t) >= max(distances[t] - distances[v])
+    so one node's bound is a single row operation, evaluated only for nodes a search touches.
+    Traffic only rescales edges, so multiplying the bound by the smallest weight / base_weight
+    ratio (scale) keeps it admissible under any reweighting.
+    """
+
+    def __init__(self, nodes, distances, signature):
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.signature = int(signature)
+        self._scale_cache = (None, 0.0)  # (vektor bobot, skala) terakhir
+
+    @staticmethod
+    def select(graph, anchors=(), count=16):
+        """Anchor nodes plus the outermost node of each remaining angular sector around the graph centre"""
+        dx, dy = graph.px - graph.px.mean(), graph.py - graph.py.mean()
+        radius = np.hypot(dx, dy)
+        sector = ((np.arctan2(dy, dx) + np.pi) / (2 * np.pi) * count).astype(np.int64) % count
+        chosen = list(dict.fromkeys(int(node) for node in anchors))
+        taken = {int(sector[node]) for node in chosen}
+        for s in range(count):
+            if len(chosen) >= count:
+                break
+            members = np.flatnonzero(sector == s)
+            if s in taken or len(members) == 0:
+                continue
+            chosen.append(int(members[np.argmax(radius[members])]))
+        return np.array(chosen, dtype=np.int64)
+
+    @classmethod
+    def build(cls, graph, anchors=(), count=16):
+        nodes = cls.select(graph, anchors, count)
+        distances = np.empty((graph.num_nodes, 2 * len(nodes)))
+        for i, node in enumerate(nodes.tolist()):
+            distances[:, i], _ = graph.shortest_path_tree(node, graph.base_weight)
+            backward, _ = graph.shortest_path_tree(node, graph.base_weight, reverse=True)
+            distances[:, len(nodes) + i] = -backward
+        # NaN in plaats van inf: selisihnya tetap NaN tanpa peringatan inf - inf saat pencarian
+        distances[~np.isfinite(distances)] = np.nan
+        logging.info(f"✅ {len(nodes)} landmark ALT dihitung untuk {graph.num_nodes} node")
+        return cls(nodes, distances, graph.signature())
+
+    def save(self, path):
+        np.savez(path, nodes=self.nodes, distances=self.distances, signature=np.int64(self.signature))
+        logging.info(f"✅ Landmark ALT disimpan ke {path}")
+
+    @classmethod
+    def load(cls, path, graph):
+        """Load saved landmarks; returns None if they were built for a different graph"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if ('distances' not in data or int(data['signature']) != graph.signature()
+                    or data['distances'].shape[0] != graph.num_nodes):
+                logging.warning(f"⚠ {path} tidak cocok dengan graf saat ini, akan dibangun ulang")
+                return None
+            landmarks = cls(data['nodes'], data['distances'], data['signature'])
+        logging.info(f"✅ Loaded {len(landmarks.nodes)} ALT landmarks from {path}")
+        return landmarks
+
+    def scale(self, graph, weight, penalties=None):
+        """Largest k with weight >= k * base_weight on every edge (penalty discounts included).
+
+        The scan over every edge runs once per weight vector, like RoutingGraph.heuristic_scale.
+        """
+        discount = min(1.0, min(penalties.values())) if penalties else 1.0
+        cached, scale = self._scale_cache
+        if cached is not weight:
+            base = graph.base_weight
+            valid = base > 0
+            scale = max(0.0, float(np.min(np.asarray(weight)[valid] / base[valid]))) if valid.any() else 0.0
+            self._scale_cache = (weight, scale)
+        return scale * discount
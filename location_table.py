@@ -0,0 +1,113 @@
+import logging
+import threading
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class LocationTable:
+    """Shortest paths between every ordered pair of named locations on one network.
+
+    Row i holds the full shortest-path tree from location i (float32 dist and pred_edge over all nodes),
+    so paths to every other location come from one single-source search per origin. cost, km
+    and minutes[mode] are (locations x locations) matrices read from those trees.
+
+    Each row carries the epoch of the weights it was computed on. refresh() moves the table to
+    a new epoch and recomputes the rows whose paths use a changed edge or could be shortened by
+    a cheaper one; the other rows just take the new epoch. Traffic is observed on the edges
+    around the named locations themselves, which end every row's paths, so in practice a
+    traffic update recomputes every row: callers should treat refresh() as a full rebuild and
+    rate-limit it. Lookups for a row that is not at the requested epoch miss, so callers fall
+    back to a normal search.
+    """
+
+    def __init__(self, network, location_nodes):
+        self.network = network
+        self.names = list(location_nodes)
+        self.nodes = np.array([network.index_of(node) for node in location_nodes.values()], dtype=np.int64)
+        self.row_of = {}  # indeks node -> baris; beberapa nama bisa jatuh ke node yang sama
+        for i, node in enumerate(self.nodes.tolist()):
+            self.row_of.setdefault(node, i)
+        n = len(self.names)
+        self.dist = np.full((n, network.num_nodes), np.inf, dtype=np.float32)  # Hanya untuk cek potong jalur di _stale_rows
+        self.pred_edge = np.full((n, network.num_nodes), -1, dtype=np.int32)
+        self.cost = np.full((n, n), np.inf)
+        self.km = np.full((n, n), np.inf, dtype=np.float32)
+        self.minutes = {}
+        self.row_epoch = np.full(n, -1, dtype=np.int64)  # -1 = sedang/belum dihitung
+        self.epoch = None
+        self.weight = None
+        self._row_edges = [np.array([], dtype=np.int64)] * n  # edge yang dipakai jalur baris ke semua lokasi
+        self._lock = threading.Lock()
+
+    def refresh(self, epoch, weight, edge_minutes):
+        """Bring the table to epoch; edge_minutes maps mode -> per-edge minutes for weight"""
+        with self._lock:
+            if self.epoch is not None and epoch <= self.epoch:
+                return 0
+            weight = np.asarray(weight)
+            rows = self._stale_rows(weight) if self.weight is not None else np.arange(len(self.names))
+            stale = np.zeros(len(self.names), dtype=bool)
+            stale[rows] = True
+            self.row_epoch[~stale] = epoch
+            self.epoch, self.weight = epoch, weight
+            for mode, minutes in edge_minutes.items():
+                self.minutes.setdefault(mode, np.full((len(self.names), len(self.names)), np.inf, dtype=np.float32))
+            for i in rows.tolist():
+                self._compute_row(i, epoch, weight, edge_minutes)
+            return len(rows)
+
+    def _stale_rows(self, weight):
+        changed = np.flatnonzero(weight != self.weight)
+        if len(changed) == 0:
+            return np.array([], dtype=np.int64)
+        # Edge yang berubah di jalur baris, atau edge yang lebih murah dan bisa memotong jalur
+        used = np.array([np.isin(changed, edges).any() for edges in self._row_edges])
+        cheaper = changed[weight[changed] < self.weight[changed]]
+        tails, heads = self.network.sources[cheaper], self.network.targets[cheaper]
+        # dist float32: toleransi relatif agar pembulatan hanya menambah baris, tidak melewatkannya
+        shortcut = (self.dist[:, tails] + weight[cheaper] < self.dist[:, heads] * (1 + 1e-6)).any(axis=1)
+        return np.flatnonzero(used | shortcut)
+
+    def _compute_row(self, i, epoch, weight, edge_minutes):
+        dist, pred_edge = self.network.shortest_path_tree(int(self.nodes[i]), weight)
+        cost = dist[self.nodes]
+        km = np.full(len(self.names), np.inf, dtype=np.float32)
+        minutes = {mode: np.full(len(self.names), np.inf, dtype=np.float32) for mode in edge_minutes}
+        used = []
+        for j, node in enumerate(self.nodes.tolist()):
+            if not np.isfinite(cost[j]):
+                continue
+            _, edges = self.network.tree_path(pred_edge, int(self.nodes[i]), node)
+            used.append(edges)
+            km[j] = self.network.length[edges].sum() / 1000
+            for mode, values in edge_minutes.items():
+                minutes[mode][j] = values[edges].sum()
+
+        self.row_epoch[i] = -1  # Pembaca yang sedang membaca baris ini akan gagal dan mencari ulang
+        self.dist[i], self.pred_edge[i], self.cost[i], self.km[i] = dist, pred_edge, cost, km
+        for mode, values in minutes.items():
+            self.minutes[mode][i] = values
+        self._row_edges[i] = np.unique(np.concatenate(used)) if used else np.array([], dtype=np.int64)
+        self.row_epoch[i] = epoch
+
+    def path(self, source, target, epoch):
+        """Node-index path between two located nodes at epoch, or None if not in the table"""
+        i, j = self.row_of.get(source), self.row_of.get(target)
+        if i is None or j is None or self.row_epoch[i] != epoch or not np.isfinite(self.cost[i, j]):
+            return None
+        pred_edge, tails = self.pred_edge[i], self.network.sources
+        nodes = [target]
+        for _ in range(self.network.num_nodes):  # Batas langkah: baris bisa sedang ditimpa refresh
+            if nodes[-1] == source:
+                break
+            edge = pred_edge[nodes[-1]]
+            if edge < 0:
+                return None
+            nodes.append(int(tails[edge]))
+        if nodes[-1] != source or self.row_epoch[i] != epoch:
+            return None  # Baris diganti saat sedang dibaca
+        return np.array(nodes[::-1], dtype=np.int64)
+
+    def ready(self, epoch):
+        return bool((self.row_epoch == epoch).all())
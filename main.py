@@ -60,6 +60,8 @@ def run_console_mode():
     
     logging.info("\n🛣 Generating sample route recommendations...")
     route_engine.update_traffic_conditions(traffic_data)
+    if route_engine.time_profiles is None:  # Profil tersimpan dimuat saat engine dibuat
+        route_engine.learn_time_profiles(traffic_data)
     route_engine.display_route_recommendations("Pasar Minggu", "Gang Mawar", max_alternatives=3, min_alternatives=1)
     
     logging.info("\n📡 Starting real-time monitoring (press Ctrl+C to stop)...")
@@ -70,11 +72,20 @@ def run_console_mode():
     except KeyboardInterrupt:
         dashboard.stop_monitoring()
 
+def rebuild_routing_artifact():
+    """Rebuild the preprocessed routing artifact after the OSM graph cache has changed"""
+    logging.info("🔧 Membangun ulang artefak routing dari bengkulu_drive_graph.pkl dan bengkulu_walk_graph.pkl...")
+    traffic_system = TrafficDataGenerator()
+    route_engine = RouteRecommendationEngine(traffic_system.bengkulu_locations, rebuild_artifact=True)
+    logging.info(f"✅ Artefak routing siap di {route_engine.ARTIFACT_DIR}")
+
 if __name__ == '__main__':
     logging.info("📍 File main.py starting...")
     logging.info("Starting main.py...")
     
-    if len(sys.argv) > 1 and sys.argv[1] == '--console':
+    if len(sys.argv) > 1 and sys.argv[1] == '--rebuild-graph':
+        rebuild_routing_artifact()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--console':
         logging.info("Running in console mode...")
         run_console_mode()
     else:
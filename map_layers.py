@@ -0,0 +1,67 @@
+import json
+from branca.element import MacroElement
+from jinja2 import Template
+
+
+class RouteLayerScript(MacroElement):
+    """Leaflet script that keeps every route as its own layer on one folium map.
+
+    The page exposes setRoutes(payload) and showRoute(index), so a host such as QWebEngineView
+    can load the page once and then swap or toggle routes with runJavaScript, without writing a
+    new file or reloading. Each payload entry carries an encoded polyline, a colour and popups.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        var routeMap = {{ this._parent.get_name() }};
+        var routeLayers = [];
+        function decodePolyline(encoded) {
+            var points = [], index = 0, lat = 0, lng = 0;
+            while (index < encoded.length) {
+                var shift = 0, result = 0, b;
+                do { b = encoded.charCodeAt(index++) - 63; result |= (b & 0x1f) << shift; shift += 5; } while (b >= 0x20);
+                lat += (result & 1) ? ~(result >> 1) : (result >> 1);
+                shift = 0; result = 0;
+                do { b = encoded.charCodeAt(index++) - 63; result |= (b & 0x1f) << shift; shift += 5; } while (b >= 0x20);
+                lng += (result & 1) ? ~(result >> 1) : (result >> 1);
+                points.push([lat / 1e5, lng / 1e5]);
+            }
+            return points;
+        }
+        function routeMarker(point, color, icon, popup) {
+            return L.marker(point, {icon: L.AwesomeMarkers.icon({icon: icon, markerColor: color, prefix: 'glyphicon'})}).bindPopup(popup);
+        }
+        function setRoutes(routes) {
+            routeLayers.forEach(function (layer) { routeMap.removeLayer(layer); });
+            routeLayers = routes.map(function (route) {
+                var line = decodePolyline(route.polyline);
+                return L.featureGroup([
+                    L.polyline(line, {color: route.color, weight: 5, opacity: 0.8}).bindPopup(route.popup),
+                    routeMarker(line[0], 'green', 'play', route.start_popup),
+                    routeMarker(line[line.length - 1], 'red', 'stop', route.end_popup)
+                ]);
+            });
+            if (routeLayers.length) {
+                var bounds = L.featureGroup(routeLayers).getBounds();
+                showRoute(0);
+                routeMap.fitBounds(bounds, {padding: [20, 20]});
+            }
+        }
+        function showRoute(index) {
+            routeLayers.forEach(function (layer, i) {
+                if (i === index) { layer.addTo(routeMap); } else { routeMap.removeLayer(layer); }
+            });
+        }
+        {% if this.routes %}setRoutes({{ this.routes }});{% endif %}
+        {% endmacro %}
+    """)
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self._name = 'RouteLayerScript'
+        self.routes = self.to_js(routes) if routes else None
+
+    @staticmethod
+    def to_js(payload):
+        """JSON for a setRoutes payload that is safe to inline in a <script> block"""
+        return json.dumps(payload).replace("</", "<\\/")
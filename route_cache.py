@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class RouteCache:
+    """Bounded in-process LRU route cache with TTL and an optional on-disk tier.
+
+    Keys are tuples chosen by the caller. The disk tier is meant only for results that do not
+    depend on traffic (e.g. walking routes); traffic-dependent keys carry the traffic epoch
+    instead, so an update makes them unreachable without touching the disk. Disk entries expire
+    after persistent_ttl_seconds and the least recently used files beyond max_persistent_files
+    are deleted, since keys such as the departure bucket keep producing new files.
+    """
+
+    def __init__(self, max_entries=512, ttl_seconds=300, persistent_dir="cache", max_persistent_files=2000,
+                 persistent_ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent_dir = persistent_dir
+        self.max_persistent_files = max_persistent_files
+        self.persistent_ttl_seconds = persistent_ttl_seconds
+        self._persistent_count = None  # perkiraan jumlah file di disk; None = belum dihitung
+        self._entries = OrderedDict()  # key -> (expires_at, routes)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.persistent_evictions = 0
+
+    def _persistent_file(self, key):
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.persistent_dir, f"routes_{digest}.pkl")
+
+    def get(self, key, persistent=False):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                del self._entries[key]
+                self.expirations += 1
+
+        if persistent and self.persistent_dir:
+            cache_file = self._persistent_file(key)
+            if self._persistent_fresh(cache_file):
+                try:
+                    with open(cache_file, 'rb') as f:
+                        routes = pickle.load(f)
+                    os.utime(cache_file)  # Waktu modifikasi = pemakaian terakhir, untuk urutan LRU di disk
+                    self._store(key, routes)
+                    with self._lock:
+                        self.persistent_hits += 1
+                    return list(routes)
+                except Exception as e:
+                    logging.warning(f"⚠ Cache rute di disk rusak ({cache_file}): {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, routes, persistent=False):
+        self._store(key, routes)
+        if persistent and self.persistent_dir:
+            try:
+                os.makedirs(self.persistent_dir, exist_ok=True)
+                with open(self._persistent_file(key), 'wb') as f:
+                    pickle.dump(routes, f)
+            except Exception as e:
+                logging.warning(f"⚠ Gagal menyimpan cache rute ke disk: {e}")
+                return
+            with self._lock:
+                if self._persistent_count is not None:
+                    self._persistent_count += 1  # Bisa lebih besar dari aslinya bila file lama ditimpa
+                prune = self._persistent_count is None or self._persistent_count > self.max_persistent_files
+            if prune:
+                self.prune_persistent()
+
+    def _persistent_fresh(self, cache_file):
+        try:
+            return os.path.getmtime(cache_file) > time.time() - self.persistent_ttl_seconds
+        except OSError:
+            return False
+
+    def prune_persistent(self):
+        """Delete expired disk entries, then the least recently used ones down to 90% of the limit"""
+        try:
+            files = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.persistent_dir)
+                     if entry.name.startswith('routes_') and entry.name.endswith('.pkl')]
+        except OSError:
+            files = []
+        files.sort()
+        cutoff = time.time() - self.persistent_ttl_seconds
+        expired = sum(1 for mtime, _ in files if mtime <= cutoff)
+        excess = len(files) - expired - int(self.max_persistent_files * 0.9)
+        doomed = files[:expired + excess] if len(files) - expired > self.max_persistent_files else files[:expired]
+        removed = 0
+        for _, path in doomed:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self._persistent_count = len(files) - removed
+            self.persistent_evictions += removed
+        if removed:
+            logging.info(f"🧹 {removed} file cache rute lama dihapus dari {self.persistent_dir}")
+        return removed
+
+    def _store(self, key, routes):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, list(routes))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'persistent_evictions': self.persistent_evictions,
+                'hit_rate': (self.hits + self.persistent_hits) / lookups if lookups else 0.0,
+            }
@@ -5,26 +5,184 @@ import logging
 import pickle
 import os
 import numpy as np
+import pandas as pd
 import requests
 from datetime import datetime, timedelta
 import heapq
+import json
+import threading
+import time
+import shapely
+from shapely.geometry import MultiPoint
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from routing_graph import RoutingGraph
+from contraction_hierarchies import ContractionHierarchy
+from route_cache import RouteCache
+from time_profiles import TimeProfiles
+from route_result import RouteResult
+from geometry import encode_polyline
+from map_layers import RouteLayerScript
+from traffic_snapshot import TrafficSnapshot
+from location_table import LocationTable
+from landmarks import Landmarks
+from shared_graph import SharedGraph
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class RouteRecommendationEngine:
-    def __init__(self, bengkulu_locations, weather_api_key=None):
+    SEARCH_MODES = ('dijkstra', 'astar', 'bidirectional_astar')
+    ARTIFACT_DIR = "bengkulu_routing_artifact"
+    ARTIFACT_VERSION = 3
+    NETWORK_LABELS = {'drive': 'driving', 'walk': 'walking'}
+    MAP_DETAIL_ZOOM = 17  # Geometri peta disederhanakan ~1 piksel pada zoom ini
+    MAP_CENTER = (-3.8000, 102.2667)
+    ROUTE_TEMPLATE_FILE = "route_template.html"
+    FACILITY_PREFIXES = {'hospital': 'RSUD', 'police': 'Polres', 'port': 'Pelabuhan'}
+    LANDMARK_FILE = "bengkulu_drive_landmarks.npz"
+    TIME_PROFILE_FILE = "bengkulu_drive_profiles.npz"
+    LANDMARK_ANCHORS = ('Bandara Fatmawati', 'Pelabuhan Pulau Baai')  # Ujung timur dan selatan kota
+    LOCATION_REFRESH_INTERVAL = 10.0  # Detik minimum antar pembaruan tabel lokasi; update di antaranya digabung
+
+    def __init__(self, bengkulu_locations, weather_api_key=None, search_mode='astar', traffic_hops=1,
+                 rebuild_artifact=False, warm_up_walking=False, precompute_locations=True, use_landmarks=True,
+                 shared_graphs=None):
+        if search_mode not in self.SEARCH_MODES:
+            raise ValueError(f"search_mode harus salah satu dari {self.SEARCH_MODES}, bukan {search_mode!r}")
+        self.search_mode = search_mode
         self.road_network = None
-        self.walking_network = None
-        self.current_traffic = None
+        self.walking_network = None  # Dimuat saat permintaan 'walking' pertama (lihat _ensure_walking_network)
+        self.snapshot = None  # TrafficSnapshot aktif; diganti utuh oleh update_traffic_conditions
         self.bengkulu_locations = bengkulu_locations
         self.location_nodes = {}
         self.walking_nodes = {}
         self.weather_api_key = weather_api_key
+        self.route_cache = RouteCache()
+        self.traffic_hops = traffic_hops
+        self.location_edges = {}  # lokasi -> indeks edge yang terpengaruh observasi di lokasi itu
+        self._node_edges = {}
+        self.time_profiles = None  # TimeProfiles dari learn_time_profiles/berkas; None berarti faktor jam sibuk datar
+        self._live_profiles = None  # (snapshot, slot, profil dasar, profil dengan faktor live di slot sekarang)
+        self._free_flow_minutes = {}  # jaringan -> menit free-flow per edge (base_weight tidak pernah berubah)
+        self._facility_trees = {}  # (kategori, mode) -> (epoch, pohon Dijkstra mundur)
+        self._rebuild_artifact = rebuild_artifact
+        self._precompute_locations = precompute_locations
+        self.location_tables = {}  # 'drive'/'walk' -> LocationTable antar lokasi bernama, diisi di latar belakang
+        self.landmarks = None  # Landmark ALT jaringan mobil; batas bawah A* dari waktu free-flow
+        self._shared_specs = shared_graphs or {}  # 'drive'/'walk' -> spec SharedGraph yang dipasang worker
+        self.shared_graphs = {}  # SharedGraph yang dipublikasikan (induk) atau dipasang (worker)
+        self._walking_lock = threading.Lock()
+        self._update_lock = threading.Lock()  # Hanya menyerialkan update; query tidak pernah menunggu
+        self._table_lock = threading.Lock()
+        self._table_refreshing = set()  # jenis jaringan yang tabel lokasinya sedang diperbarui thread latar
+        self._table_refreshed_at = {}  # jenis jaringan -> waktu monotonic pembaruan tabel terakhir dimulai
         self._initialize_networks()
-        self._map_locations_to_nodes()
+        self._build_traffic_index()
+        if use_landmarks:
+            self._initialize_landmarks()
+        self.time_profiles = TimeProfiles.load(self.TIME_PROFILE_FILE, self.road_network)
+        self.snapshot = self._make_snapshot(0, self.road_network.weight)
+        self._start_location_table('drive')
+        if rebuild_artifact:
+            self._ensure_walking_network()
+        elif warm_up_walking:
+            threading.Thread(target=self._ensure_walking_network, daemon=True).start()
 
     def _initialize_networks(self):
-        logging.info("🌍 Mulai mengambil data OSM untuk Kota Bengkulu...")
+        """Load the driving network; car and motorcycle routing is ready once this returns"""
+        self.road_network, self.location_nodes = self._load_network('drive')
+
+    def _initialize_landmarks(self):
+        """Load the drive-graph ALT landmarks saved next to the CH file, building them if needed"""
+        shared = self.shared_graphs.get('drive')
+        if shared is not None and 'landmark_nodes' in shared.arrays:
+            a = shared.arrays
+            self.landmarks = Landmarks(a['landmark_nodes'], a['landmark_distances'], self.road_network.signature())
+            return
+        try:
+            self.landmarks = Landmarks.load(self.LANDMARK_FILE, self.road_network)
+            if self.landmarks is None:
+                logging.info("⏳ Menghitung landmark ALT untuk jaringan mobil...")
+                anchors = [self.road_network.index_of(self.location_nodes[name])
+                           for name in self.LANDMARK_ANCHORS if name in self.location_nodes]
+                self.landmarks = Landmarks.build(self.road_network, anchors)
+                self.landmarks.save(self.LANDMARK_FILE)
+        except Exception as e:
+            logging.error(f"❌ Gagal menyiapkan landmark ALT, memakai batas garis lurus: {str(e)}")
+            self.landmarks = None
+
+    def _ensure_walking_network(self):
+        """Load the walking network and its location mapping on first use (thread-safe)"""
+        if self.walking_network is None:
+            with self._walking_lock:
+                if self.walking_network is None:
+                    network, nodes = self._load_network('walk')
+                    self.walking_nodes = nodes
+                    self.walking_network = network
+                    self._start_location_table('walk')
+        return self.walking_network
+
+    def _network_for(self, mode):
+        return self._ensure_walking_network() if mode == 'walking' else self.road_network
+
+    def _load_network(self, network_type):
+        """RoutingGraph and location->node mapping, from the binary artifact or rebuilt from the OSM cache"""
+        if network_type in self._shared_specs:
+            # Worker: graf langsung di atas blok shared memory milik proses induk
+            shared = SharedGraph.attach(self._shared_specs[network_type])
+            self.shared_graphs[network_type] = shared
+            network = shared.graph()
+            RouteResult.register_network(network)
+            return network, dict(shared.locations)
+        directory = os.path.join(self.ARTIFACT_DIR, network_type)
+        cached_locations = {}
+        network = None if self._rebuild_artifact else self._load_routing_artifact(directory)
+        if network is not None:
+            network, cached_locations = network
+            built = False
+        else:
+            network = self._load_osm_network(network_type)
+            built = True
+        nodes = self._map_locations_to_nodes(network, cached_locations, self.NETWORK_LABELS[network_type])
+        if built:
+            self._save_routing_artifact(directory, network, nodes)
+        RouteResult.register_network(network)
+        return network, nodes
+
+    def _load_routing_artifact(self, directory):
+        """Open a preprocessed graph with memory-mapped arrays; None if missing or outdated"""
+        meta_file = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_file):
+            return None
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != self.ARTIFACT_VERSION:
+                logging.warning(f"⚠ Versi artefak routing {directory} berbeda, membangun ulang dari cache OSM...")
+                return None
+            network = RoutingGraph.load(directory)
+            logging.info(f"✅ Loaded routing artifact from {directory}: {network.num_nodes} nodes, {network.num_edges} edges")
+            return network, meta.get('locations', {})
+        except Exception as e:
+            logging.warning(f"⚠ Artefak routing {directory} rusak: {e}, membangun ulang dari cache OSM...")
+            return None
+
+    def _save_routing_artifact(self, directory, network, nodes):
+        try:
+            network.save(directory)
+            locations = {
+                location: {'coords': list(coords), 'node': nodes[location]}
+                for location, coords in self.bengkulu_locations.items() if location in nodes
+            }
+            # meta.json ditulis terakhir sehingga artefak setengah jadi tidak pernah dianggap valid
+            with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+                json.dump({'version': self.ARTIFACT_VERSION, 'created': datetime.now().isoformat(), 'locations': locations}, f, indent=2)
+            logging.info(f"✅ Saved routing artifact to {directory}")
+        except Exception as e:
+            logging.warning(f"⚠ Gagal menyimpan artefak routing: {e}")
+
+    def _load_osm_network(self, network_type):
+        label = self.NETWORK_LABELS[network_type]
+        logging.info(f"🌍 Mulai mengambil data OSM {label} untuk Kota Bengkulu...")
         try:
             ox.settings.timeout = 60
             ox.settings.log_console = True
@@ -32,58 +190,43 @@ class RouteRecommendationEngine:
             ox.settings.cache_folder = "./osm_cache"
             os.makedirs("./osm_cache", exist_ok=True)
 
-            # Cache for driving network (cars and motorcycles)
-            drive_cache_file = "bengkulu_drive_graph.pkl"
-            if os.path.exists(drive_cache_file):
+            # Cache graf OSM: drive untuk mobil dan motor, walk untuk pejalan kaki
+            cache_file = f"bengkulu_{network_type}_graph.pkl"
+            if os.path.exists(cache_file):
                 try:
-                    with open(drive_cache_file, 'rb') as f:
-                        G_drive = pickle.load(f)
-                    logging.info("✅ Loaded driving network graph from cache")
+                    with open(cache_file, 'rb') as f:
+                        G = pickle.load(f)
+                    logging.info(f"✅ Loaded {label} network graph from cache")
                 except Exception as e:
-                    logging.warning(f"⚠ Drive cache file corrupted: {e}, downloading fresh data...")
-                    G_drive = self._download_osm_graph('drive')
-                    with open(drive_cache_file, 'wb') as f:
-                        pickle.dump(G_drive, f)
+                    logging.warning(f"⚠ {label.capitalize()} cache file corrupted: {e}, downloading fresh data...")
+                    G = self._download_osm_graph(network_type)
+                    with open(cache_file, 'wb') as f:
+                        pickle.dump(G, f)
             else:
-                G_drive = self._download_osm_graph('drive')
-                with open(drive_cache_file, 'wb') as f:
-                    pickle.dump(G_drive, f)
-                logging.info("✅ Saved driving network graph to cache")
-
-            # Cache for walking network (pedestrians)
-            walk_cache_file = "bengkulu_walk_graph.pkl"
-            if os.path.exists(walk_cache_file):
-                try:
-                    with open(walk_cache_file, 'rb') as f:
-                        G_walk = pickle.load(f)
-                    logging.info("✅ Loaded walking network graph from cache")
-                except Exception as e:
-                    logging.warning(f"⚠ Walk cache file corrupted: {e}, downloading fresh data...")
-                    G_walk = self._download_osm_graph('walk')
-                    with open(walk_cache_file, 'wb') as f:
-                        pickle.dump(G_walk, f)
-            else:
-                G_walk = self._download_osm_graph('walk')
-                with open(walk_cache_file, 'wb') as f:
-                    pickle.dump(G_walk, f)
-                logging.info("✅ Saved walking network graph to cache")
-
-            # Convert to directed graphs and validate nodes
-            self.road_network = nx.DiGraph(G_drive)
-            self.walking_network = nx.DiGraph(G_walk)
-
-            # Remove nodes without coordinates from driving network
-            invalid_nodes = [n for n, d in self.road_network.nodes(data=True) if 'x' not in d or 'y' not in d]
-            self.road_network.remove_nodes_from(invalid_nodes)
-            logging.info(f"🧹 Removed {len(invalid_nodes)} invalid nodes from driving network")
-
-            # Process driving network (for cars and motorcycles)
-            for u, v, data in self.road_network.edges(data=True):
+                G = self._download_osm_graph(network_type)
+                with open(cache_file, 'wb') as f:
+                    pickle.dump(G, f)
+                logging.info(f"✅ Saved {label} network graph to cache")
+
+            # Convert to directed graph and validate nodes
+            network = nx.DiGraph(G)
+            del G
+
+            # Remove nodes without coordinates
+            invalid_nodes = [n for n, d in network.nodes(data=True) if 'x' not in d or 'y' not in d]
+            network.remove_nodes_from(invalid_nodes)
+            logging.info(f"🧹 Removed {len(invalid_nodes)} invalid nodes from {label} network")
+
+            for u, v, data in network.edges(data=True):
                 length = data.get('length', 1000)
                 if not isinstance(length, (int, float)) or length <= 0:
                     logging.warning(f"⚠ Invalid length for edge ({u}, {v}): {length}, using default 1000m")
                     length = 1000
                 data['weight'] = length / 1000
+                if network_type == 'walk':
+                    data['preference'] = 1.0 if data.get('highway') in ['path', 'footway', 'steps', 'residential'] else 1.2
+                    continue
+                # Driving network (for cars and motorcycles)
                 speed = data.get('maxspeed', 40)
                 try:
                     data['speed_limit'] = float(speed[0] if isinstance(speed, list) else speed.split()[0] if isinstance(speed, str) else speed)
@@ -91,22 +234,10 @@ class RouteRecommendationEngine:
                     data['speed_limit'] = 40
                 data['preference'] = 1.0 if data.get('highway') in ['primary', 'secondary', 'tertiary'] else 1.5
 
-            # Remove nodes without coordinates from walking network
-            invalid_nodes = [n for n, d in self.walking_network.nodes(data=True) if 'x' not in d or 'y' not in d]
-            self.walking_network.remove_nodes_from(invalid_nodes)
-            logging.info(f"🧹 Removed {len(invalid_nodes)} invalid nodes from walking network")
-
-            # Process walking network
-            for u, v, data in self.walking_network.edges(data=True):
-                length = data.get('length', 1000)
-                if not isinstance(length, (int, float)) or length <= 0:
-                    logging.warning(f"⚠ Invalid length for edge ({u}, {v}): {length}, using default 1000m")
-                    length = 1000
-                data['weight'] = length / 1000
-                data['preference'] = 1.0 if data.get('highway') in ['path', 'footway', 'steps', 'residential'] else 1.2
-
-            logging.info(f"✅ Driving graph: {len(self.road_network.nodes)} nodes, {len(self.road_network.edges)} edges")
-            logging.info(f"✅ Walking graph: {len(self.walking_network.nodes)} nodes, {len(self.walking_network.edges)} edges")
+            # networkx hanya dipakai untuk impor; routing berjalan di atas array CSR
+            graph = RoutingGraph.from_networkx(network)
+            logging.info(f"✅ {label.capitalize()} graph: {graph.num_nodes} nodes, {graph.num_edges} edges")
+            return graph
         except Exception as e:
             logging.error(f"❌ Gagal mengambil data OSM: {str(e)}")
             raise
@@ -124,63 +255,192 @@ class RouteRecommendationEngine:
             logging.info(f"✅ Downloaded OSM {network_type} data using center point with 15 km radius")
             return G
 
-    def _map_locations_to_nodes(self):
+    def _map_locations_to_nodes(self, network, cached_locations, label):
+        nodes = {}
+        pending = []
         for location, coords in self.bengkulu_locations.items():
-            try:
-                # Map to driving network (for cars and motorcycles)
-                node = ox.distance.nearest_nodes(self.road_network, coords[1], coords[0])
-                if not self.road_network.has_node(node):
-                    logging.error(f"❌ Node {node} for {location} not in driving graph")
-                    continue
-                if 'x' not in self.road_network.nodes[node] or 'y' not in self.road_network.nodes[node]:
-                    logging.error(f"❌ Node {node} for {location} missing coordinates in driving graph")
-                    continue
-                if len(list(self.road_network.edges(node))) == 0:
-                    logging.warning(f"⚠ Node {node} for {location} has no edges in driving graph, finding nearest connected node...")
-                    neighbors = [n for n in self.road_network.neighbors(node) if self.road_network.degree(n) > 0]
-                    node = node if neighbors else ox.distance.nearest_nodes(self.road_network, coords[1], coords[0], return_dist=False)
-                self.location_nodes[location] = node
-
-                # Map to walking network
-                walk_node = ox.distance.nearest_nodes(self.walking_network, coords[1], coords[0])
-                if not self.walking_network.has_node(walk_node):
-                    logging.error(f"❌ Node {walk_node} for {location} not in walking graph")
-                    continue
-                if 'x' not in self.walking_network.nodes[walk_node] or 'y' not in self.walking_network.nodes[walk_node]:
-                    logging.error(f"❌ Node {walk_node} for {location} missing coordinates in walking graph")
-                    continue
-                if len(list(self.walking_network.edges(walk_node))) == 0:
-                    logging.warning(f"⚠ Node {walk_node} for {location} has no edges in walking graph, finding nearest connected node...")
-                    neighbors = [n for n in self.walking_network.neighbors(walk_node) if self.walking_network.degree(n) > 0]
-                    walk_node = walk_node if neighbors else ox.distance.nearest_nodes(self.walking_network, coords[1], coords[0], return_dist=False)
-                self.walking_nodes[location] = walk_node
+            cached = cached_locations.get(location)
+            if cached and cached.get('coords') == list(coords) and cached.get('node') is not None:
+                nodes[location] = cached['node']
+            else:
+                pending.append(location)
+        if not pending:
+            return nodes
+        try:
+            # Satu panggilan batch ke indeks spasial untuk semua lokasi yang belum terpetakan
+            coords = np.array([self.bengkulu_locations[location] for location in pending], dtype=np.float64)
+            snapped, _ = network.nearest_nodes(coords[:, 0], coords[:, 1])
+            for location, node in zip(pending, network.node_ids[snapped].tolist()):
+                nodes[location] = node
+                logging.info(f"✅ Mapped {location} to {label} node {node} at coordinates {self.bengkulu_locations[location]}")
+        except Exception as e:
+            logging.warning(f"⚠ Could not map locations in {label} network: {e}")
+        return nodes
 
-                logging.info(f"✅ Mapped {location} to driving node {node} and walking node {walk_node} at coordinates {coords}")
-            except Exception as e:
-                logging.warning(f"⚠ Could not map {location}: {e}")
+    def snap_coordinates(self, coordinates, mode='car'):
+        """OSM node ids and snapping distances (km) for a batch of (lat, lon) pairs"""
+        network = self._network_for(mode)
+        coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        snapped, distances = network.nearest_nodes(coords[:, 0], coords[:, 1])
+        return network.node_ids[snapped].tolist(), distances.tolist()
+
+    def _build_traffic_index(self):
+        """Precompute, per mapped location, the drive edges its traffic observations reweight"""
+        for location, node in self.location_nodes.items():
+            self.location_edges[location] = self._edges_near_node(node)
+        logging.info(f"✅ Indeks edge traffic dibuat untuk {len(self.location_edges)} lokasi ({self.traffic_hops} hop)")
+
+    def _edges_near_node(self, node):
+        edges = self._node_edges.get(node)
+        if edges is None:
+            index = self.road_network.index_of(node)
+            edges = self.road_network.neighbourhood_edges(index, self.traffic_hops) if index >= 0 else np.array([], dtype=np.int64)
+            self._node_edges[node] = edges
+        return edges
+
+    @property
+    def traffic_epoch(self):
+        """Epoch of the current snapshot; part of every traffic-dependent cache key"""
+        return self.snapshot.epoch
+
+    @property
+    def current_traffic(self):
+        return self.snapshot.traffic if self.snapshot is not None else None
+
+    @property
+    def edge_congestion(self):
+        return self.snapshot.congestion if self.snapshot is not None else None
 
     def update_traffic_conditions(self, traffic_data, location_nodes_cache=None):
-        self.current_traffic = traffic_data
-        if self.current_traffic is not None:
-            location_nodes = location_nodes_cache if location_nodes_cache is not None else self.location_nodes
-            new_weights = {}
-            relevant_nodes = set(location_nodes.values())
-            for _, row in self.current_traffic.iterrows():
-                location = row['location']
-                congestion = row['congestion_ratio']
-                avg_speed = row['avg_speed']
-                weather_intensity = row.get('weather_intensity', 0.0)
-                node = location_nodes.get(location)
-                if node:
-                    for u, v, data in self.road_network.edges(data=True):
-                        if u in relevant_nodes or v in relevant_nodes:
-                            base_weight = data.get('weight', 1.0)
-                            speed_factor = max(0.5, data.get('speed_limit', 50) / max(avg_speed, 5))
-                            weather_factor = 1 + (weather_intensity * 0.1)
-                            preference_factor = data.get('preference', 1.0)
-                            new_weights[(u, v)] = base_weight * (1 + congestion) * speed_factor * weather_factor * preference_factor
-            nx.set_edge_attributes(self.road_network, new_weights, 'weight')
-            logging.info("✅ Kondisi traffic di jaringan jalan diperbarui dengan faktor cuaca")
+        if traffic_data is None:
+            return
+        with self._update_lock:
+            network = self.road_network
+            if location_nodes_cache is not None:
+                location_edges = {loc: self._edges_near_node(node) for loc, node in location_nodes_cache.items()}
+            else:
+                location_edges = self.location_edges
+            congestion, avg_speed, weather_intensity, observed = self._edge_traffic_vectors(network, traffic_data, location_edges)
+            # Vektor bobot baru dibangun di luar snapshot aktif, lalu dipublikasikan dengan satu pertukaran referensi
+            weight = network.traffic_weights(congestion, avg_speed, weather_intensity, observed)
+            snapshot = self._make_snapshot(self.snapshot.epoch + 1, weight,
+                                           np.where(observed, congestion, np.nan).astype(np.float32), traffic_data,
+                                           changed=np.flatnonzero(weight != self.snapshot.weight))
+            self.snapshot = snapshot
+            network.weight = snapshot.weight
+        logging.info("✅ Kondisi traffic di jaringan jalan diperbarui dengan faktor cuaca")
+        if 'drive' in self.location_tables:
+            self._schedule_location_refresh('drive')
+
+    def _make_snapshot(self, epoch, weight, congestion=None, traffic=None, changed=None):
+        return TrafficSnapshot(epoch, weight, congestion, traffic, changed=changed)
+
+    def _start_location_table(self, network_type):
+        """Build the named-location table for a network in a background thread"""
+        if not self._precompute_locations:
+            return
+        if network_type == 'drive':
+            table = LocationTable(self.road_network, self.location_nodes)
+        else:
+            table = LocationTable(self.walking_network, self.walking_nodes)
+        self.location_tables[network_type] = table
+        self._schedule_location_refresh(network_type)
+
+    def _schedule_location_refresh(self, network_type):
+        """Start a refresh thread unless one is running; a running thread follows newer epochs itself"""
+        with self._table_lock:
+            if network_type in self._table_refreshing:
+                return
+            self._table_refreshing.add(network_type)
+        threading.Thread(target=self._refresh_location_table, args=(network_type,), daemon=True).start()
+
+    def _refresh_location_table(self, network_type):
+        """Bring a location table to the current snapshot.
+
+        Observed edges sit around the named locations, so a traffic update usually changes every
+        row and a refresh amounts to a full rebuild (one pure-Python search per location). It
+        therefore runs at most once per LOCATION_REFRESH_INTERVAL: updates that arrive meanwhile
+        are coalesced into the next refresh by the one running thread, which loops until the
+        table matches the latest snapshot. Queries fall back to normal searches until then.
+        """
+        table = self.location_tables[network_type]
+        try:
+            while True:
+                last = self._table_refreshed_at.get(network_type)
+                if last is not None:
+                    time.sleep(max(0.0, last + self.LOCATION_REFRESH_INTERVAL - time.monotonic()))
+                with self._table_lock:
+                    if network_type == 'drive':
+                        snapshot = self.snapshot
+                        epoch, weight, modes = snapshot.epoch, snapshot.weight, ('car', 'motorcycle')
+                    else:
+                        epoch, weight, modes = 0, table.network.weight, ('walking',)
+                    if table.epoch is not None and table.epoch >= epoch:
+                        self._table_refreshing.discard(network_type)
+                        return
+                self._table_refreshed_at[network_type] = time.monotonic()
+                edge_minutes = {mode: self._edge_times(table.network, slice(None), mode, weight) for mode in modes}
+                rows = table.refresh(epoch, weight, edge_minutes)
+                if rows:
+                    logging.info(f"✅ Tabel rute lokasi {self.NETWORK_LABELS[network_type]} epoch {epoch}: "
+                                 f"{rows}/{len(table.names)} baris dihitung ulang")
+        except Exception as e:
+            logging.error(f"❌ Gagal memperbarui tabel rute lokasi {network_type}: {str(e)}")
+            with self._table_lock:
+                self._table_refreshing.discard(network_type)
+
+    def _table_path(self, network, source, target, snapshot):
+        """Primary path from the location table when both ends are named locations and the row is current"""
+        if network is self.road_network:
+            table, epoch = self.location_tables.get('drive'), snapshot.epoch
+        else:
+            table, epoch = self.location_tables.get('walk'), 0
+        return table.path(source, target, epoch) if table is not None else None
+
+    def location_matrix(self, mode='car', value='minutes'):
+        """Pairwise 'minutes', 'km' or 'cost' between named locations as a DataFrame (inf = unreachable).
+
+        Rows lag the latest traffic update until the rate-limited background refresh catches up.
+        """
+        network_type = 'walk' if mode == 'walking' else 'drive'
+        self._network_for(mode)
+        table = self.location_tables.get(network_type)
+        if table is None:
+            raise ValueError("Tabel rute lokasi tidak aktif (precompute_locations=False)")
+        matrix = table.minutes.get(mode) if value == 'minutes' else getattr(table, value)
+        if matrix is None:
+            return None
+        return pd.DataFrame(matrix, index=table.names, columns=table.names)
+
+    def _weight_for(self, network, snapshot):
+        """Edge weights a query should use: the pinned snapshot for roads, static weights for walking"""
+        return snapshot.weight if snapshot is not None and network is self.road_network else network.weight
+
+    def _edge_traffic_vectors(self, network, traffic_data, location_edges):
+        """Scatter traffic rows onto per-edge congestion, speed and weather vectors (last row per edge wins)"""
+        rows = []
+        for i, location in enumerate(traffic_data['location']):
+            edges = location_edges.get(location)
+            if edges is not None and len(edges):
+                rows.append((edges, i))
+        congestion = np.zeros(network.num_edges)
+        avg_speed = np.ones(network.num_edges)
+        weather_intensity = np.zeros(network.num_edges)
+        observed = np.zeros(network.num_edges, dtype=bool)
+        if not rows:
+            return congestion, avg_speed, weather_intensity, observed
+
+        edges = np.concatenate([e for e, _ in rows])
+        row_of_edge = np.repeat([i for _, i in rows], [len(e) for e, _ in rows])
+        # Ambil kemunculan terakhir tiap edge supaya observasi terbaru yang dipakai
+        unique_edges, last = np.unique(edges[::-1], return_index=True)
+        row_of_edge = row_of_edge[::-1][last]
+        congestion[unique_edges] = traffic_data['congestion_ratio'].to_numpy(dtype=np.float64)[row_of_edge]
+        avg_speed[unique_edges] = traffic_data['avg_speed'].to_numpy(dtype=np.float64)[row_of_edge]
+        if 'weather_intensity' in traffic_data:
+            weather_intensity[unique_edges] = traffic_data['weather_intensity'].to_numpy(dtype=np.float64)[row_of_edge]
+        observed[unique_edges] = True
+        return congestion, avg_speed, weather_intensity, observed
 
     def get_weather_data(self, lat=-3.80044, lon=102.26554):
         if not self.weather_api_key:
@@ -201,86 +461,70 @@ class RouteRecommendationEngine:
 
     def get_alternative_routes(self, start, end, departure_time=None, max_alternatives=5, min_alternatives=3, mode='car'):
         logging.info(f"🔍 Menghitung rute fleksibel dari {start} ke {end} at {departure_time or 'now'} for mode {mode}...")
+        return self._calculate_routes(start, end, departure_time, max_alternatives, mode)
+
+    def get_routes_between_coordinates(self, start_coords, end_coords, departure_time=None, max_alternatives=5, mode='car'):
+        """Routes between raw (lat, lon) positions, e.g. GPS fixes from field units"""
+        (start_node, end_node), distances = self.snap_coordinates([start_coords, end_coords], mode)
+        start = f"({start_coords[0]:.5f}, {start_coords[1]:.5f})"
+        end = f"({end_coords[0]:.5f}, {end_coords[1]:.5f})"
+        logging.info(f"🔍 Menghitung rute dari {start} ke {end} for mode {mode} (snap {distances[0] * 1000:.0f} m / {distances[1] * 1000:.0f} m)")
+        return self._routes_between(start, end, start_node, end_node, departure_time, max_alternatives, mode)
+
+    def _calculate_routes(self, start, end, departure_time, max_alternatives, mode):
         if start not in self.location_nodes or end not in self.location_nodes:
             logging.error(f"❌ Lokasi start atau end tidak valid: {start} → {end}")
             return []
 
         # Select network and nodes based on mode
-        if mode == 'walking':
-            network = self.walking_network
-            start_node = self.walking_nodes[start]
-            end_node = self.walking_nodes[end]
-        else:  # car or motorcycle
-            network = self.road_network
-            start_node = self.location_nodes[start]
-            end_node = self.location_nodes[end]
+        self._network_for(mode)
+        nodes = self.walking_nodes if mode == 'walking' else self.location_nodes
+        if start not in nodes or end not in nodes:
+            logging.error(f"❌ Lokasi {start} atau {end} tidak terpetakan di jaringan {mode}")
+            return []
+        return self._routes_between(start, end, nodes[start], nodes[end], departure_time, max_alternatives, mode)
 
+    def _routes_between(self, start, end, start_node, end_node, departure_time, max_alternatives, mode):
+        """Primary and alternative routes between two OSM nodes; start/end are display labels"""
+        network = self._network_for(mode)
+        snapshot = self.snapshot  # Dipakai sampai selesai, walau update traffic datang di tengah jalan
         alternative_routes = []
-        temp_graph = network.copy()
 
-        cache_key = f"{start}_{end}_{max_alternatives}_{mode}"
-        cache_file = f"cache/routes_{cache_key}.pkl"
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    cached_routes = pickle.load(f)
-                logging.info(f"✅ Memuat rute dari cache untuk {start} ke {end} mode {mode}")
-                return cached_routes
-            except:
-                logging.warning(f"⚠ Cache rusak, menghitung ulang rute")
+        # Rute jalan kaki tidak dipengaruhi traffic, jadi boleh disimpan permanen di disk
+        traffic_independent = mode == 'walking'
+        epoch = network.signature() if traffic_independent else snapshot.epoch
+        cache_key = (start, end, mode, max_alternatives, self._departure_bucket(departure_time), epoch)
+        cached_routes = self.route_cache.get(cache_key, persistent=traffic_independent)
+        if cached_routes is not None:
+            logging.info(f"✅ Memuat rute dari cache untuk {start} ke {end} mode {mode}")
+            return cached_routes
 
         try:
             # Gunakan A* untuk rute utama
-            shortest_path = nx.astar_path(temp_graph, start_node, end_node, heuristic=self._heuristic, weight='weight')
-            paths = [(shortest_path, 0)]  # (path, penalty)
-
-            # Generate rute alternatif dengan penalti edge
-            for i in range(max_alternatives - 1):
-                new_path = self._generate_alternative_path(temp_graph, shortest_path, end_node, penalty_factor=1.2 + i * 0.2)
-                if new_path and tuple(new_path) not in [tuple(p) for p, _ in paths]:
-                    paths.append((new_path, 1.2 + i * 0.2))
-
-            for path, _ in paths[:max_alternatives]:
-                coordinates = []
-                for node in path:
-                    try:
-                        node_data = temp_graph.nodes[node]
-                        if 'y' in node_data and 'x' in node_data:
-                            coordinates.append((node_data['y'], node_data['x']))
-                        else:
-                            logging.warning(f"⚠ Node {node} in path missing coordinates, skipping...")
-                            continue
-                    except Exception as e:
-                        logging.warning(f"⚠ Error accessing coordinates for node {node}: {e}")
-                        continue
-                if len(coordinates) < 2:
-                    logging.error(f"❌ Route path for {start} to {end} via {mode} has insufficient valid coordinates")
-                    continue
+            source, target = network.index_of(start_node), network.index_of(end_node)
+            # Dengan profil waktu tempuh, rute mobil/motor dicari berdasarkan jam keberangkatan
+            departure_minute = self._departure_minute(departure_time) if mode != 'walking' else None
+            shortest_path = None
+            if departure_minute is None or not self._has_time_profiles(network):
+                # Pasangan lokasi bernama: jalur utama langsung dari tabel pra-hitung
+                shortest_path = self._table_path(network, source, target, snapshot)
+            if shortest_path is None:
+                shortest_path = self._shortest_path(network, source, target, departure_minute, snapshot)
+            if shortest_path is None:
+                logging.error(f"❌ Tidak ada jalur dari {start} ke {end} untuk mode {mode}")
+                return []
+            paths = [shortest_path] + self._alternative_paths(network, shortest_path, target, max_alternatives - 1,
+                                                              departure_minute, snapshot)
 
-                total_distance = self.calculate_distance(path, mode)
-                estimated_time = self.estimate_time(path, departure_time, mode)
-                congestion_level = self.analyze_congestion(path) if mode in ['car', 'motorcycle'] else "Low"
-                route_quality = self.assess_route_quality(path, mode)
-
-                route = {
-                    'path': path,
-                    'coordinates': coordinates,
-                    'total_distance': total_distance,
-                    'estimated_time': estimated_time,
-                    'congestion_level': congestion_level,
-                    'route_quality': route_quality,
-                    'start_location': start,
-                    'end_location': end,
-                    'mode': mode
-                }
-                alternative_routes.append(route)
+            for i, path in enumerate(paths[:max_alternatives], 1):
+                route = self._build_route(network, path, start, end, departure_time, mode, i, snapshot)
+                if route is not None:
+                    alternative_routes.append(route)
 
             alternative_routes.sort(key=lambda x: (x['total_distance'], x['estimated_time'], -1 if x['route_quality'] == "Good" else 0))
             alternative_routes = alternative_routes[:max_alternatives]
 
-            os.makedirs("cache", exist_ok=True)
-            with open(cache_file, 'wb') as f:
-                pickle.dump(alternative_routes, f)
+            self.route_cache.put(cache_key, alternative_routes, persistent=traffic_independent)
             logging.info(f"✅ Menyimpan rute ke cache untuk {start} ke {end} mode {mode}")
 
             return alternative_routes
@@ -288,78 +532,369 @@ class RouteRecommendationEngine:
             logging.error(f"❌ Error menghitung rute: {str(e)}")
             return []
 
-    def _heuristic(self, node1, node2, network=None):
-        """Heuristic untuk algoritma A* berdasarkan jarak Euclidean"""
-        try:
-            network = network or self.road_network
-            if node1 not in network.nodes or node2 not in network.nodes:
-                raise ValueError(f"Node not found in network: node1={node1}, node2={node2}")
-            data1, data2 = network.nodes[node1], network.nodes[node2]
-            if 'x' not in data1 or 'y' not in data1 or 'x' not in data2 or 'y' not in data2:
-                raise KeyError(f"Missing coordinates: node1={node1} ({data1}), node2={node2} ({data2})")
-            x1, y1 = float(data1['x']), float(data1['y'])
-            x2, y2 = float(data2['x']), float(data2['y'])
-            distance = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2) / 1000  # Konversi ke kilometer
-            return distance
-        except Exception as e:
-            logging.warning(f"⚠ Error in heuristic calculation: node1={node1}, node2={node2}, error={str(e)}")
-            return 0  # Fallback, tapi sebaiknya diperbaiki di masa depan
+    def _build_route(self, network, path, start, end, departure_time, mode, route_index=1, snapshot=None):
+        """RouteResult for a path of node indices; None if it has fewer than two nodes"""
+        if path is None or len(path) < 2:
+            logging.error(f"❌ Route path for {start} to {end} via {mode} has insufficient valid coordinates")
+            return None
+
+        summary = self._summarize_path(network, path, network.node_ids[path], departure_time, mode, snapshot or self.snapshot)
+        return RouteResult(network, path, summary['edges'], summary['total_distance'], summary['estimated_time'],
+                           summary['congestion_level'], summary['route_quality'], start, end, mode,
+                           route_index=route_index, congestion_score=summary['congestion_score'])
+
+    def _search(self, network, source, target, weight=None, penalties=None, stats=None, departure_minute=None,
+                snapshot=None):
+        """Point-to-point search in the configured search_mode, time-dependent when a departure minute is given"""
+        landmarks = self.landmarks if network is self.road_network else None
+        if departure_minute is not None and self._has_time_profiles(network):
+            edge_minutes = self._free_flow_minutes.get(network)
+            if edge_minutes is None:
+                edge_minutes = self._free_flow_minutes[network] = self._edge_times(network, slice(None),
+                                                                                  weight=network.base_weight)
+            return network.time_dependent_path(source, target, edge_minutes, self._profiles_for(snapshot),
+                                               departure_minute, stats=stats, penalties=penalties, landmarks=landmarks)
+        if self.search_mode == 'dijkstra':
+            return network.shortest_path(source, target, weight, stats=stats, penalties=penalties)
+        if self.search_mode == 'astar':
+            return network.astar(source, target, weight, stats=stats, penalties=penalties, landmarks=landmarks)
+        return network.bidirectional_astar(source, target, weight, stats=stats, penalties=penalties, landmarks=landmarks)
+
+    def _shortest_path(self, network, source, target, departure_minute=None, snapshot=None):
+        weight = self._weight_for(network, snapshot or self.snapshot)
+        path, _, _ = self._search(network, source, target, weight, departure_minute=departure_minute, snapshot=snapshot)
+        return path
+
+    def _alternative_paths(self, network, base_path, end_node, count, departure_minute=None, snapshot=None):
+        """Up to count distinct alternatives to base_path.
+
+        Static weights: via-node/plateau alternatives from one forward and one backward tree. The
+        penalty re-search is kept for time-dependent departures (the trees assume fixed weights)
+        and tops up the list when the city has too few plateaus with acceptable stretch.
+        """
+        if count <= 0 or base_path is None or len(base_path) < 2:
+            return []
+        paths = []
+        if departure_minute is None or not self._has_time_profiles(network):
+            weight = self._weight_for(network, snapshot or self.snapshot)
+            edges = network.path_edges(base_path)
+            try:
+                landmarks = self.landmarks if network is self.road_network else None
+                alternatives = network.plateau_alternatives(base_path[0], end_node, weight, count,
+                                                            primary_edges=edges[edges >= 0], landmarks=landmarks)
+                paths = [nodes for nodes, _, _ in alternatives]
+            except Exception as e:
+                logging.error(f"❌ Error generating plateau alternatives: {str(e)}")
+        seen = {tuple(p.tolist()) for p in [base_path] + paths}
+        for i in range(count - len(paths)):
+            new_path = self._generate_alternative_path(network, base_path, end_node, penalty_factor=1.2 + i * 0.2,
+                                                       departure_minute=departure_minute, snapshot=snapshot)
+            if new_path is not None and tuple(new_path.tolist()) not in seen:
+                seen.add(tuple(new_path.tolist()))
+                paths.append(new_path)
+        return paths
 
-    def _generate_alternative_path(self, G, base_path, end_node, penalty_factor=1.2):
+    def _generate_alternative_path(self, network, base_path, end_node, penalty_factor=1.2, departure_minute=None, snapshot=None):
         try:
-            if not base_path or len(base_path) < 2:
+            if base_path is None or len(base_path) < 2:
                 return None
-            temp_graph = G.copy()
-            for i in range(len(base_path) - 1):
-                u, v = base_path[i], base_path[i + 1]
-                if temp_graph.has_edge(u, v):
-                    temp_graph[u][v]['weight'] = temp_graph[u][v].get('weight', 1.0) * penalty_factor
-            alt_path = nx.astar_path(temp_graph, base_path[0], end_node, heuristic=self._heuristic, weight='weight')
-            return alt_path if alt_path != base_path else None
+            # Penalti dipasang sebagai overlay jarang; bobot jaringan tidak disalin atau diubah
+            edges = network.path_edges(base_path)
+            penalties = dict.fromkeys(edges[edges >= 0].tolist(), penalty_factor)
+            weight = self._weight_for(network, snapshot or self.snapshot)
+            alt_path, _, _ = self._search(network, base_path[0], end_node, weight, penalties=penalties,
+                                          departure_minute=departure_minute, snapshot=snapshot)
+            return alt_path if alt_path is not None and not np.array_equal(alt_path, base_path) else None
         except Exception as e:
             logging.error(f"❌ Error generating alternative path: {str(e)}")
             return None
 
-    def estimate_time_for_edge(self, u, v, historical_factor=1.0, mode='car', network=None):
-        network = network or self.road_network
-        weight = network[u][v].get('weight', 1.0)
+    def _edge_times(self, network, edges, mode='car', weight=None):
+        """Travel time in minutes for one edge index or an array of them"""
+        weight = (network.weight if weight is None else weight)[edges]
         if mode == 'walking':
             speed = 5  # Average walking speed: 5 km/h
         elif mode == 'motorcycle':
-            speed = network[u][v].get('speed_limit', 40) * 0.9  # Motorcycles slightly slower than cars
+            speed = network.speed_limit[edges] * 0.9  # Motorcycles slightly slower than cars
         else:  # car
-            speed = network[u][v].get('speed_limit', 40)
-        return (weight / speed) * 60 * historical_factor
+            speed = network.speed_limit[edges]
+        return (weight / speed) * 60
+
+    def estimate_time_for_edge(self, u, v, historical_factor=1.0, mode='car', network=None):
+        """Minutes to drive/walk the edge between OSM nodes u and v; KeyError if there is no such edge"""
+        network = network if network is not None else self.road_network
+        tail, head = network.index_of(u), network.index_of(v)
+        edge = network.edge_between(tail, head) if tail >= 0 and head >= 0 else -1
+        if edge < 0:
+            raise KeyError(f"Edge ({u}, {v}) tidak ada di jaringan {mode}")
+        return float(self._edge_times(network, edge, mode)) * historical_factor
+
+    def _path_edges(self, network, path, mode='car'):
+        """Edge indices along a path of OSM node ids, skipping edges the network doesn't have"""
+        nodes = np.array([network.index_of(n) for n in path], dtype=np.int64)
+        return self._valid_path_edges(network, nodes, path, mode)
+
+    def _valid_path_edges(self, network, nodes, path, mode):
+        if len(nodes) < 2:
+            return np.array([], dtype=np.int64)
+        edges = np.full(len(nodes) - 1, -1, dtype=np.int64)
+        known = (nodes[:-1] >= 0) & (nodes[1:] >= 0)
+        if known.all():
+            edges = network.path_edges(nodes)
+        elif known.any():
+            edges[known] = [network.edge_between(u, v) for u, v in zip(nodes[:-1][known].tolist(), nodes[1:][known].tolist())]
+        for i in np.flatnonzero(edges < 0).tolist():
+            logging.warning(f"⚠ Edge ({path[i]}, {path[i + 1]}) not found in {mode} network, skipping...")
+        return edges[edges >= 0]
+
+    def _summarize_path(self, network, nodes, node_path, departure_time=None, mode='car', snapshot=None):
+        """Distance, time, congestion and quality of a node-index path from one edge gather"""
+        snapshot = snapshot or self.snapshot
+        edges = self._valid_path_edges(network, np.asarray(nodes, dtype=np.int64), node_path, mode)
+        if mode in ['car', 'motorcycle']:
+            congestion_score = self.congestion_score(edges, snapshot)
+            congestion_level = self._congestion_level(congestion_score)
+        else:
+            congestion_score, congestion_level = 0.0, "Low"
+        return {
+            'edges': edges,
+            'congestion_score': congestion_score,
+            'total_distance': float(network.length[edges].sum()) / 1000,
+            'estimated_time': self._path_time(network, edges, departure_time, mode, snapshot),
+            'congestion_level': congestion_level,
+            'route_quality': self._quality_for(congestion_level),
+        }
 
     def calculate_distance(self, path, mode='car'):
-        network = self.walking_network if mode == 'walking' else self.road_network
-        distance = 0
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            if not network.has_edge(u, v):
-                logging.warning(f"⚠ Edge ({u}, {v}) not found in {mode} network, skipping...")
-                continue
-            distance += network[u][v].get('weight', 1.0)
-        return distance
+        """Route length in km from the base edge lengths (unaffected by traffic)"""
+        network = self._network_for(mode)
+        edges = self._path_edges(network, path, mode)
+        return float(network.length[edges].sum()) / 1000
 
     def estimate_time(self, path, departure_time=None, mode='car'):
-        network = self.walking_network if mode == 'walking' else self.road_network
-        total_time = 0
+        network = self._network_for(mode)
+        return self._path_time(network, self._path_edges(network, path, mode), departure_time, mode)
+
+    def _path_time(self, network, edges, departure_time=None, mode='car', snapshot=None):
+        departure_minute = self._departure_minute(departure_time) if mode != 'walking' else None
+        if departure_minute is not None and self._has_time_profiles(network):
+            # Waktu tiap edge dievaluasi pada jam saat edge itu dimasuki
+            path_minutes = self._edge_times(network, edges, mode, weight=network.base_weight)
+            return network.time_dependent_minutes(edges, path_minutes, self._profiles_for(snapshot), departure_minute)
         historical_factor = self.get_historical_factor(departure_time) if departure_time else 1.0
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            if not network.has_edge(u, v):
-                logging.warning(f"⚠ Edge ({u}, {v}) not found in {mode} network, skipping...")
+        weight = self._weight_for(network, snapshot or self.snapshot)
+        return float(self._edge_times(network, edges, mode, weight).sum()) * historical_factor
+
+    def _has_time_profiles(self, network):
+        return (self.time_profiles is not None and network is self.road_network
+                and self.time_profiles.factors.shape[0] == network.num_edges)
+
+    def _profiles_for(self, snapshot=None):
+        """Time profiles with the current time-of-day bucket replaced by the snapshot's live factors.
+
+        Observed edges entered during the bucket the clock is in now cost their live traffic
+        weight (incidents included) instead of the learned average; other buckets and unobserved
+        edges keep the profile. Cached per snapshot and bucket.
+        """
+        profiles, snapshot = self.time_profiles, snapshot or self.snapshot
+        if snapshot is None or snapshot.congestion is None:
+            return profiles
+        now = datetime.now()
+        bucket = profiles.bucket(now.hour * 60 + now.minute)
+        cached = self._live_profiles
+        if cached is not None and cached[0] is snapshot and cached[1] == bucket and cached[2] is profiles:
+            return cached[3]
+        network = self.road_network
+        observed = ~np.isnan(snapshot.congestion)
+        factors = profiles.factors.copy()
+        factors[observed, bucket] = snapshot.weight[observed] / network.base_weight[observed]
+        live = TimeProfiles(factors, profiles.bucket_minutes, profiles.signature)
+        self._live_profiles = (snapshot, bucket, profiles, live)
+        return live
+
+    def learn_time_profiles(self, traffic_history, bucket_minutes=60, path=None):
+        """Learn per-edge travel-time factors per time-of-day bucket from traffic history.
+
+        Rows are averaged per location and bucket and spread onto edges the same way as live
+        updates; edges without history keep the flat rush-hour profile of get_historical_factor.
+        The profiles are saved to path (TIME_PROFILE_FILE by default) and loaded at startup.
+        """
+        network = self.road_network
+        if traffic_history is None or traffic_history.empty:
+            logging.warning("⚠ Tidak ada riwayat traffic untuk mempelajari profil waktu tempuh")
+            return None
+        default_row = TimeProfiles.default_row(bucket_minutes)
+        factors = np.tile(default_row, (network.num_edges, 1))
+        timestamps = pd.to_datetime(traffic_history['timestamp'])
+        buckets = ((timestamps.dt.hour * 60 + timestamps.dt.minute) // bucket_minutes).to_numpy()
+        columns = [c for c in ('congestion_ratio', 'avg_speed', 'weather_intensity') if c in traffic_history]
+        for bucket in np.unique(buckets).tolist():
+            rows = traffic_history[buckets == bucket]
+            averaged = rows.groupby('location', as_index=False)[columns].mean()
+            congestion, avg_speed, weather_intensity, observed = self._edge_traffic_vectors(network, averaged, self.location_edges)
+            weight = network.traffic_weights(congestion, avg_speed, weather_intensity, observed)
+            factors[observed, bucket] = weight[observed] / network.base_weight[observed]
+        self.time_profiles = TimeProfiles(factors, bucket_minutes, network.signature())
+        self.route_cache.clear()
+        try:
+            self.time_profiles.save(path or self.TIME_PROFILE_FILE)
+        except Exception as e:
+            logging.error(f"❌ Gagal menyimpan profil waktu tempuh: {str(e)}")
+        logging.info(f"✅ Profil waktu tempuh dipelajari: {network.num_edges} edge x {len(default_row)} slot {bucket_minutes} menit")
+        return self.time_profiles
+
+    def _resolve_origin(self, origin, mode):
+        """(label, OSM node, (lat, lon)) for a location name or a raw (lat, lon) pair"""
+        if isinstance(origin, str):
+            self._network_for(mode)
+            nodes = self.walking_nodes if mode == 'walking' else self.location_nodes
+            if origin not in nodes:
+                raise ValueError(f"Lokasi {origin} tidak terpetakan di jaringan {mode}")
+            return origin, nodes[origin], tuple(self.bengkulu_locations[origin])
+        (node,), _ = self.snap_coordinates([origin], mode)
+        return f"({origin[0]:.5f}, {origin[1]:.5f})", node, (float(origin[0]), float(origin[1]))
+
+    def compute_isochrone(self, origin, mode='car', budgets=(5, 10, 15), departure_time=None):
+        """Nodes reachable from origin within each time budget (minutes), with a polygon per budget.
+
+        One bounded Dijkstra over the per-edge travel times covers every budget at once.
+        """
+        network = self._network_for(mode)
+        label, node, coords = self._resolve_origin(origin, mode)
+        historical_factor = self.get_historical_factor(departure_time) if departure_time else 1.0
+        weight = self._weight_for(network, self.snapshot)
+        edge_minutes = self._edge_times(network, slice(None), mode, weight) * historical_factor
+        budgets = sorted(budgets)
+        dist, _ = network.bounded_dijkstra(network.index_of(node), edge_minutes, limit=budgets[-1])
+        reached = np.fromiter(dist.keys(), dtype=np.int64, count=len(dist))
+        minutes = np.fromiter(dist.values(), dtype=np.float64, count=len(dist))
+
+        isochrones = []
+        for budget in budgets:
+            inside = reached[minutes <= budget]
+            isochrones.append({
+                'budget': budget,
+                'nodes': network.node_ids[inside].tolist(),
+                'polygon': self._reachability_polygon(network, inside, coords),
+            })
+        logging.info(f"✅ Isochrone {label} ({mode}): {len(reached)} node dalam {budgets[-1]} menit")
+        return {'origin': label, 'origin_coordinates': coords, 'mode': mode, 'isochrones': isochrones}
+
+    def _reachability_polygon(self, network, nodes, origin_coords, ratio=0.3):
+        """Concave hull of the reached nodes as a list of (lat, lon); convex hull on shapely < 2.0"""
+        points = [(lon, lat) for lat, lon in network.coordinates(nodes)] + [(origin_coords[1], origin_coords[0])]
+        if hasattr(shapely, 'concave_hull'):
+            hull = shapely.concave_hull(MultiPoint(points), ratio=ratio)
+        else:
+            hull = MultiPoint(points).convex_hull  # shapely 1.8 (dipakai osmnx 1.x) belum punya concave_hull
+        if hull.geom_type != 'Polygon':
+            hull = hull.buffer(0.001)  # Terlalu sedikit titik: lingkaran kecil ~100 m
+        return [(lat, lon) for lon, lat in hull.exterior.coords]
+
+    def hospital_coverage(self, mode='car', budgets=(5, 10, 15), departure_time=None):
+        """Isochrones for every RSUD entry in bengkulu_locations"""
+        return [self.compute_isochrone(name, mode, budgets, departure_time)
+                for name in self.bengkulu_locations if name.startswith('RSUD')]
+
+    def facilities(self, category):
+        """Location names in a facility category ('hospital', 'police' or 'port')"""
+        prefix = self.FACILITY_PREFIXES[category]
+        return [name for name in self.bengkulu_locations if name.startswith(prefix)]
+
+    def _facility_tree(self, category, mode):
+        """Reverse shortest-path tree towards the nearest facility, cached per traffic epoch"""
+        network = self._network_for(mode)
+        snapshot = self.snapshot
+        epoch = network.signature() if mode == 'walking' else snapshot.epoch
+        cached = self._facility_trees.get((category, mode))
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+
+        nodes = self.walking_nodes if mode == 'walking' else self.location_nodes
+        roots = {}
+        for name in self.facilities(category):
+            if name in nodes:
+                roots.setdefault(network.index_of(nodes[name]), name)
+        if not roots:
+            raise ValueError(f"Tidak ada fasilitas {category} yang terpetakan di jaringan {mode}")
+        # Satu Dijkstra mundur multi-sumber: dist[v] = waktu dari v ke fasilitas terdekat
+        edge_minutes = self._edge_times(network, slice(None), mode, self._weight_for(network, snapshot))
+        dist, pred_edge = network.bounded_dijkstra(list(roots), edge_minutes, reverse=True)
+        tree = (dist, pred_edge, roots)
+        self._facility_trees[(category, mode)] = (epoch, tree)
+        logging.info(f"✅ Pohon fasilitas {category} ({mode}) dibangun: {len(roots)} fasilitas, {len(dist)} node")
+        return tree
+
+    def nearest_facility(self, origin, category='hospital', mode='car', departure_time=None):
+        """Route from a location name or (lat, lon) to the fastest-reachable facility of a category.
+
+        After the cached tree is built, each lookup only walks the tree from origin to its root.
+        """
+        network = self._network_for(mode)
+        label, node, _ = self._resolve_origin(origin, mode)
+        dist, pred_edge, roots = self._facility_tree(category, mode)
+        u = network.index_of(node)
+        if u not in dist:
+            logging.error(f"❌ Tidak ada fasilitas {category} yang terjangkau dari {label} ({mode})")
+            return None
+        path = [u]
+        while u not in roots:
+            u = int(network.targets[pred_edge[u]])
+            path.append(u)
+        if len(path) == 1:
+            # Titik asal sudah berada di fasilitas
+            route = RouteResult(network, path, [], 0.0, 0.0, "Low", "Good", label, roots[u], mode)
+        else:
+            route = self._build_route(network, np.array(path, dtype=np.int64), label, roots[u], departure_time, mode)
+        if route is not None:
+            route['facility'] = roots[u]
+            route['facility_category'] = category
+        return route
+
+    DEPARTURE_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M", "%H:%M:%S", "%H:%M")
+
+    def _parse_departure(self, departure_time):
+        """datetime for a departure given as datetime/Timestamp, Unix seconds, ISO text or 'HH:MM'; None if unknown"""
+        if departure_time is None or departure_time == "":
+            return None
+        if isinstance(departure_time, datetime):
+            return departure_time
+        if isinstance(departure_time, (int, float, np.integer, np.floating)):
+            return datetime.fromtimestamp(float(departure_time))
+        text = str(departure_time).strip()
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass
+        for fmt in self.DEPARTURE_FORMATS:
+            try:
+                dt = datetime.strptime(text, fmt)
+            except ValueError:
                 continue
-            total_time += self.estimate_time_for_edge(u, v, historical_factor, mode, network)
-        return total_time
+            if dt.year == 1900:  # Hanya jam: anggap hari ini
+                dt = datetime.combine(datetime.now().date(), dt.time())
+            return dt
+        return None
+
+    def _departure_minute(self, departure_time):
+        """Minute of the day of a departure time, or None"""
+        dt = self._parse_departure(departure_time)
+        return dt.hour * 60 + dt.minute + dt.second / 60 if dt is not None else None
+
+    def _departure_bucket(self, departure_time, minutes=15):
+        """Round a departure time down to a cache bucket; None means 'now'"""
+        if not departure_time:
+            return None
+        dt = self._parse_departure(departure_time)
+        if dt is None:
+            return str(departure_time)
+        return dt.replace(minute=dt.minute - dt.minute % minutes, second=0, microsecond=0).isoformat()
 
     def get_historical_factor(self, departure_time):
         if not departure_time:
             return 1.0
         try:
-            dt = datetime.strptime(str(departure_time), "%Y-%m-%d %H:%M:%S.%f")
-            hour = dt.hour
+            hour = self._parse_departure(departure_time).hour
             if (7 <= hour < 9) or (17 <= hour < 19):
                 return 1.5
             return 1.0
@@ -367,13 +902,34 @@ class RouteRecommendationEngine:
             return 1.0
 
     def analyze_congestion(self, path):
-        if self.current_traffic is not None and not self.current_traffic.empty:
-            avg_congestion = self.current_traffic['congestion_ratio'].mean()
-            return "High" if avg_congestion > 0.7 else "Moderate" if avg_congestion > 0.4 else "Low"
-        return "Unknown"
+        """Congestion level along a path of road-network OSM node ids"""
+        return self._congestion_level(self.congestion_score(self._path_edges(self.road_network, path)))
+
+    def congestion_score(self, edges, snapshot=None):
+        """Length-weighted mean congestion_ratio over the observed road edges among edges.
+
+        None without traffic data; 0.0 if no edge on the route was observed.
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None or snapshot.congestion is None:
+            return None
+        congestion = snapshot.congestion[edges]
+        observed = ~np.isnan(congestion)
+        length = self.road_network.length[edges][observed]
+        if length.sum() <= 0:
+            return 0.0
+        return float(np.dot(congestion[observed], length) / length.sum())
+
+    def _congestion_level(self, score):
+        if score is None:
+            return "Unknown"
+        return "High" if score > 0.7 else "Moderate" if score > 0.4 else "Low"
 
     def assess_route_quality(self, path, mode='car'):
         congestion = self.analyze_congestion(path) if mode in ['car', 'motorcycle'] else "Low"
+        return self._quality_for(congestion)
+
+    def _quality_for(self, congestion):
         return "Good" if congestion == "Low" else "Moderate" if congestion == "Moderate" else "Poor"
 
     def create_route_map(self, route, filename, idx=1):
@@ -383,26 +939,12 @@ class RouteRecommendationEngine:
                 logging.error("❌ Route coordinates are empty or invalid")
                 return None
 
-            full_path = os.path.abspath(os.path.join(os.getcwd(), "maps", filename))
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
-
-            # Tentukan warna berdasarkan congestion_level
             congestion_level = route['congestion_level']
-            if congestion_level == "Low":
-                line_color = '#4CAF50'  # Hijau untuk Lancar
-            elif congestion_level == "Moderate":
-                line_color = '#FFCA28'  # Kuning untuk Sedang
-            else:  # High
-                line_color = '#FF5722'  # Merah untuk Macet
-
-            # Tambahkan warna biru untuk rute alternatif (selain rute utama)
-            is_alternative = idx > 1
-            if is_alternative:
-                line_color = '#2196F3'  # Biru untuk alternatif
+            line_color = self._route_color(route, idx)
 
             m = folium.Map(location=route['coordinates'][0], zoom_start=13, tiles='OpenStreetMap')
             folium.PolyLine(
-                locations=route['coordinates'],
+                locations=self._map_geometry(route),
                 color=line_color,
                 weight=5,
                 opacity=0.8,
@@ -419,111 +961,280 @@ class RouteRecommendationEngine:
                 icon=folium.Icon(color='red', icon='stop')
             ).add_to(m)
 
-            m.save(full_path)
-            logging.info(f"✅ Route map saved to: {full_path}")
-            if os.path.exists(full_path):
-                logging.info(f"✅ File {full_path} confirmed to exist")
-                return full_path
-            else:
-                logging.error(f"❌ File {full_path} not found after saving")
-                return None
+            return self._save_map(m, filename)
         except Exception as e:
             logging.error(f"❌ Failed to create route map: {str(e)}")
             return None
         finally:
             logging.info("🎉 Completed route map creation process")
 
+    def _route_color(self, route, idx=1):
+        # Tentukan warna berdasarkan congestion_level
+        congestion_level = route['congestion_level']
+        if congestion_level == "Low":
+            line_color = '#4CAF50'  # Hijau untuk Lancar
+        elif congestion_level == "Moderate":
+            line_color = '#FFCA28'  # Kuning untuk Sedang
+        else:  # High
+            line_color = '#FF5722'  # Merah untuk Macet
+
+        # Tambahkan warna biru untuk rute alternatif (selain rute utama)
+        is_alternative = idx > 1
+        if is_alternative:
+            line_color = '#2196F3'  # Biru untuk alternatif
+        return line_color
+
+    def route_layer_payload(self, routes):
+        """setRoutes() payload for a route template page: one encoded polyline and style per route"""
+        payload = []
+        for idx, route in enumerate(routes, 1):
+            payload.append({
+                'polyline': encode_polyline(self._map_geometry(route)),
+                'color': self._route_color(route, idx),
+                'popup': f"Rute dari {route['start_location']} ke {route['end_location']} ({route['mode']})<br>Jarak: {route['total_distance']:.2f} km<br>Waktu: {route['estimated_time']:.2f} menit<br>Kemacetan: {route['congestion_level']}",
+                'start_popup': f"Start: {route['start_location']} ({route['mode']})",
+                'end_popup': f"End: {route['end_location']} ({route['mode']})",
+            })
+        return payload
+
+    def create_route_map_template(self, filename=ROUTE_TEMPLATE_FILE, routes=None):
+        """Single page holding every route as a toggleable layer (setRoutes / showRoute in JS).
+
+        Without routes this is the base template the GUI loads once and fills with runJavaScript.
+        """
+        try:
+            m = folium.Map(location=self.MAP_CENTER, zoom_start=13, tiles='OpenStreetMap')
+            RouteLayerScript(self.route_layer_payload(routes) if routes else None).add_to(m)
+            return self._save_map(m, filename)
+        except Exception as e:
+            logging.error(f"❌ Failed to create route map template: {str(e)}")
+            return None
+
+    def create_multi_route_map(self, routes, filename):
+        """All alternatives in one HTML file instead of one file per route"""
+        return self.create_route_map_template(filename, routes)
+
+    def _map_geometry(self, route, zoom=MAP_DETAIL_ZOOM):
+        """Road-shape geometry simplified for the map, rounded to ~1 m to keep the HTML small"""
+        if hasattr(route, 'geometry'):
+            return np.round(route.geometry(zoom), 5).tolist()
+        return route['coordinates']
+
+    def create_isochrone_map(self, isochrones, filename):
+        """Draw one or more compute_isochrone results (e.g. hospital_coverage) on a single map"""
+        try:
+            if isinstance(isochrones, dict):
+                isochrones = [isochrones]
+            if not isochrones:
+                logging.error("❌ No isochrones to draw")
+                return None
+            # Anggaran terbesar digambar dulu supaya area yang lebih dekat tetap terlihat di atasnya
+            colors = ['#4CAF50', '#FFCA28', '#FF5722']
+            m = folium.Map(location=isochrones[0]['origin_coordinates'], zoom_start=13, tiles='OpenStreetMap')
+            for result in isochrones:
+                layers = result['isochrones']
+                for rank, layer in reversed(list(enumerate(layers))):
+                    color = colors[min(rank, len(colors) - 1)]
+                    folium.Polygon(
+                        locations=layer['polygon'],
+                        color=color,
+                        weight=2,
+                        fill=True,
+                        fill_color=color,
+                        fill_opacity=0.2,
+                        popup=f"{result['origin']} ({result['mode']})<br>≤ {layer['budget']} menit<br>{len(layer['nodes'])} node terjangkau"
+                    ).add_to(m)
+                folium.Marker(
+                    location=result['origin_coordinates'],
+                    popup=f"{result['origin']} ({result['mode']})",
+                    icon=folium.Icon(color='red', icon='plus')
+                ).add_to(m)
+            return self._save_map(m, filename)
+        except Exception as e:
+            logging.error(f"❌ Failed to create isochrone map: {str(e)}")
+            return None
+
+    def _save_map(self, m, filename):
+        full_path = os.path.abspath(os.path.join(os.getcwd(), "maps", filename))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        m.save(full_path)
+        logging.info(f"✅ Map saved to: {full_path}")
+        if os.path.exists(full_path):
+            logging.info(f"✅ File {full_path} confirmed to exist")
+            return full_path
+        logging.error(f"❌ File {full_path} not found after saving")
+        return None
+
 class OptimizedRouteRecommendationEngine(RouteRecommendationEngine):
-    def __init__(self, bengkulu_locations, weather_api_key=None):
+    def __init__(self, bengkulu_locations, weather_api_key=None, use_contraction_hierarchies=False, **kwargs):
         logging.info("🔍 Initializing OptimizedRouteRecommendationEngine...")
-        super().__init__(bengkulu_locations, weather_api_key)
+        self.contraction_hierarchy = None
+        # Opsi konstruktor disimpan agar worker batch bisa membuat engine yang sama
+        self._engine_options = dict(kwargs, weather_api_key=weather_api_key, use_contraction_hierarchies=use_contraction_hierarchies)
+        self._engine_options.pop('rebuild_artifact', None)
+        self._engine_options.pop('warm_up_walking', None)
+        self._engine_options.pop('shared_graphs', None)
+        self._worker_pool = None
+        super().__init__(bengkulu_locations, weather_api_key, **kwargs)
+        if use_contraction_hierarchies:
+            self._initialize_contraction_hierarchies()
+            s = self.snapshot
+            self.snapshot = self._make_snapshot(s.epoch, s.weight, s.congestion, s.traffic, s.changed)
+
+    def _initialize_contraction_hierarchies(self, ch_file="bengkulu_drive_ch.npz"):
+        """Load the drive-graph hierarchy saved next to bengkulu_drive_graph.pkl, building it if needed"""
+        try:
+            self.contraction_hierarchy = ContractionHierarchy.load(ch_file, self.road_network)
+            if self.contraction_hierarchy is None:
+                logging.info("⏳ Membangun Contraction Hierarchies untuk jaringan mobil...")
+                self.contraction_hierarchy = ContractionHierarchy.build(self.road_network)
+                self.contraction_hierarchy.save(ch_file)
+        except Exception as e:
+            logging.error(f"❌ Gagal menyiapkan Contraction Hierarchies, memakai A*: {str(e)}")
+            self.contraction_hierarchy = None
+
+    def update_traffic_conditions(self, traffic_data, location_nodes_cache=None):
+        super().update_traffic_conditions(traffic_data, location_nodes_cache)
+        shared = self.shared_graphs.get('drive')
+        if shared is not None and shared.owner:
+            with self._update_lock:
+                snapshot = self.snapshot
+                if shared.current()[1] != snapshot.epoch:
+                    shared.write(snapshot.epoch, snapshot.weight, snapshot.congestion)
+
+    def _sync_shared_snapshot(self):
+        """Worker: pin the weights the parent published last; returns (slot, epoch) to re-check after the query"""
+        slot, epoch, weight, congestion = self.shared_graphs['drive'].current()
+        if epoch != self.snapshot.epoch:
+            self.snapshot = self._make_snapshot(epoch, weight, congestion)
+            self.road_network.weight = self.snapshot.weight
+        return slot, epoch
+
+    def start_worker_pool(self, processes=None, walking=True):
+        """Publish the graphs in shared memory and start a persistent pool that route_batch reuses.
+
+        Workers attach to the topology, coordinates, landmarks and weight slots without copying
+        them; later update_traffic_conditions calls reach every worker through the weight slots.
+        Time profiles are passed once at start, so restart the pool after learn_time_profiles.
+        """
+        if self._worker_pool is not None:
+            return self._worker_pool
+        if walking:
+            self._ensure_walking_network()
+        extras = {}
+        if self.landmarks is not None:
+            extras = {'landmark_nodes': self.landmarks.nodes, 'landmark_distances': self.landmarks.distances}
+        try:
+            self.shared_graphs['drive'] = SharedGraph.publish(self.road_network, self.location_nodes, extras)
+            snapshot = self.snapshot
+            self.shared_graphs['drive'].write(snapshot.epoch, snapshot.weight, snapshot.congestion)
+            if self.walking_network is not None:
+                self.shared_graphs['walk'] = SharedGraph.publish(self.walking_network, self.walking_nodes)
+            specs = {network_type: shared.spec() for network_type, shared in self.shared_graphs.items()}
+            options = dict(self._engine_options, precompute_locations=False, shared_graphs=specs)
+            self._worker_pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_shared_worker,
+                                                    initargs=(self.bengkulu_locations, options, self.time_profiles))
+        except Exception:
+            self.stop_worker_pool()
+            raise
+        logging.info(f"🚀 Pool routing shared memory siap ({processes or os.cpu_count()} worker)")
+        return self._worker_pool
+
+    def stop_worker_pool(self):
+        """Shut the persistent pool down and release the shared memory blocks"""
+        if self._worker_pool is not None:
+            self._worker_pool.shutdown()
+            self._worker_pool = None
+        for shared in self.shared_graphs.values():
+            shared.close()
+        self.shared_graphs = {}
+
+    def _make_snapshot(self, epoch, weight, congestion=None, traffic=None, changed=None):
+        # Kustomisasi CH eksak untuk bobot apa pun, jadi setiap snapshot traffic membawa bobot arc sendiri
+        ch = self.contraction_hierarchy
+        ch_weight = ch.weights_for(weight) if ch is not None else None
+        return TrafficSnapshot(epoch, weight, congestion, traffic, ch_weight, changed)
+
+    def _shortest_path(self, network, source, target, departure_minute=None, snapshot=None):
+        # CH memakai bobot statis; pencarian bergantung waktu tetap lewat A*
+        snapshot = snapshot or self.snapshot
+        if (self.contraction_hierarchy is not None and network is self.road_network and departure_minute is None
+                and snapshot.ch_weight is not None):
+            path, _, _ = self.contraction_hierarchy.shortest_path(network, source, target, snapshot.ch_weight)
+            return path
+        return super()._shortest_path(network, source, target, departure_minute, snapshot)
 
     def get_alternative_routes(self, start, end, departure_time=None, max_alternatives=5, min_alternatives=3, mode='car'):
         logging.info(f"🔍 Optimized route calculation for {start} to {end} with mode {mode}...")
-        if start not in self.location_nodes or end not in self.location_nodes:
-            logging.error(f"❌ Lokasi start atau end tidak valid: {start} → {end}")
-            return []
+        return self._calculate_routes(start, end, departure_time, max_alternatives, mode)
 
-        # Select network and nodes based on mode
-        if mode == 'walking':
-            network = self.walking_network
-            start_node = self.walking_nodes[start]
-            end_node = self.walking_nodes[end]
-        else:  # car or motorcycle
-            network = self.road_network
-            start_node = self.location_nodes[start]
-            end_node = self.location_nodes[end]
+    def route_batch(self, requests, max_alternatives=3, processes=None):
+        """Route many (start, end, mode, departure) tuples on a process pool.
 
-        alternative_routes = []
-        temp_graph = network.copy()
+        Yields (request, routes) as each request finishes, not in input order. With a pool from
+        start_worker_pool the workers share the parent's graphs and live weights; otherwise a
+        temporary pool is created, each worker opens the routing artifact once and applies the
+        traffic weights current at submission time.
+        """
+        requests = list(requests)
+        if not requests:
+            return
+        if processes == 1:
+            for request in requests:
+                start, end, mode, departure = request
+                yield request, self._calculate_routes(start, end, departure, max_alternatives, mode)
+            return
+
+        logging.info(f"🚀 Menghitung {len(requests)} pasangan OD dengan process pool...")
+        if self._worker_pool is not None:
+            yield from self._collect_batch(self._worker_pool, requests, max_alternatives)
+            return
+        if any(request[2] == 'walking' for request in requests):
+            self._ensure_walking_network()  # RouteResult dari worker butuh graf yang sama di proses ini
+        initargs = (self.bengkulu_locations, self._engine_options, self.snapshot, self.time_profiles)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker, initargs=initargs) as pool:
+            yield from self._collect_batch(pool, requests, max_alternatives)
 
-        cache_key = f"{start}_{end}_{max_alternatives}_{mode}"
-        cache_file = f"cache/routes_{cache_key}.pkl"
-        if os.path.exists(cache_file):
+    def _collect_batch(self, pool, requests, max_alternatives):
+        futures = {pool.submit(_route_batch_request, request, max_alternatives): request for request in requests}
+        for future in as_completed(futures):
+            request = futures[future]
             try:
-                with open(cache_file, 'rb') as f:
-                    cached_routes = pickle.load(f)
-                logging.info(f"✅ Memuat rute dari cache untuk {start} ke {end} mode {mode}")
-                return cached_routes
-            except:
-                logging.warning(f"⚠ Cache rusak, menghitung ulang rute")
+                yield request, future.result()
+            except Exception as e:
+                logging.error(f"❌ Error menghitung rute batch {request}: {str(e)}")
+                yield request, []
 
-        try:
-            # Gunakan A* untuk rute utama
-            shortest_path = nx.astar_path(temp_graph, start_node, end_node, heuristic=self._heuristic, weight='weight')
-            paths = [(shortest_path, 0)]  # (path, penalty)
-
-            # Generate rute alternatif dengan penalti edge
-            for i in range(max_alternatives - 1):
-                new_path = self._generate_alternative_path(temp_graph, shortest_path, end_node, penalty_factor=1.2 + i * 0.2)
-                if new_path and tuple(new_path) not in [tuple(p) for p, _ in paths]:
-                    paths.append((new_path, 1.2 + i * 0.2))
-
-            for i, (path, _) in enumerate(paths[:max_alternatives], 1):
-                coordinates = []
-                for node in path:
-                    try:
-                        node_data = temp_graph.nodes[node]
-                        if 'y' in node_data and 'x' in node_data:
-                            coordinates.append((node_data['y'], node_data['x']))
-                        else:
-                            logging.warning(f"⚠ Node {node} in path missing coordinates, skipping...")
-                            continue
-                    except Exception as e:
-                        logging.warning(f"⚠ Error accessing coordinates for node {node}: {e}")
-                        continue
-                if len(coordinates) < 2:
-                    logging.error(f"❌ Route path for {start} to {end} via {mode} has insufficient valid coordinates")
-                    continue
 
-                total_distance = self.calculate_distance(path, mode)
-                estimated_time = self.estimate_time(path, departure_time, mode)
-                congestion_level = self.analyze_congestion(path) if mode in ['car', 'motorcycle'] else "Low"
-                route_quality = self.assess_route_quality(path, mode)
-
-                route = {
-                    'path': path,
-                    'coordinates': coordinates,
-                    'total_distance': total_distance,
-                    'estimated_time': estimated_time,
-                    'congestion_level': congestion_level,
-                    'route_quality': route_quality,
-                    'start_location': start,
-                    'end_location': end,
-                    'mode': mode,
-                    'route_index': i  # Menambahkan indeks rute
-                }
-                alternative_routes.append(route)
+_batch_engine = None  # Engine per proses worker, dibuat sekali oleh _init_batch_worker
 
-            alternative_routes.sort(key=lambda x: (x['total_distance'], x['estimated_time'], -1 if x['route_quality'] == "Good" else 0))
-            alternative_routes = alternative_routes[:max_alternatives]
 
-            os.makedirs("cache", exist_ok=True)
-            with open(cache_file, 'wb') as f:
-                pickle.dump(alternative_routes, f)
-            logging.info(f"✅ Menyimpan rute ke cache untuk {start} ke {end} mode {mode}")
+def _init_batch_worker(bengkulu_locations, engine_options, snapshot, time_profiles):
+    global _batch_engine
+    logging.getLogger().setLevel(logging.WARNING)
+    _batch_engine = OptimizedRouteRecommendationEngine(bengkulu_locations, **dict(engine_options, precompute_locations=False))
+    # Snapshot induk dipasang utuh (bobot, kemacetan, epoch); bobot arc CH dihitung ulang di worker
+    _batch_engine.snapshot = _batch_engine._make_snapshot(snapshot.epoch, snapshot.weight, snapshot.congestion,
+                                                          snapshot.traffic)
+    _batch_engine.road_network.weight = _batch_engine.snapshot.weight
+    _batch_engine.time_profiles = time_profiles
 
-            return alternative_routes
-        except Exception as e:
-            logging.error(f"❌ Error menghitung rute: {str(e)}")
-            return []
+
+def _init_shared_worker(bengkulu_locations, engine_options, time_profiles):
+    global _batch_engine
+    logging.getLogger().setLevel(logging.WARNING)
+    _batch_engine = OptimizedRouteRecommendationEngine(bengkulu_locations, **engine_options)
+    _batch_engine.time_profiles = time_profiles
+
+
+def _route_batch_request(request, max_alternatives):
+    start, end, mode, departure = request
+    shared = _batch_engine.shared_graphs.get('drive')
+    if shared is None:
+        return _batch_engine._calculate_routes(start, end, departure, max_alternatives, mode)
+    while True:
+        slot, epoch = _batch_engine._sync_shared_snapshot()
+        routes = _batch_engine._calculate_routes(start, end, departure, max_alternatives, mode)
+        if shared.is_current(slot, epoch):
+            return routes
+        # Slot bobot ditimpa dua update induk selama query: hitung ulang dengan bobot terbaru
@@ -0,0 +1,136 @@
+import numpy as np
+from geometry import encode_polyline, simplify_coordinates, to_geojson, tolerance_for_zoom
+
+
+class RouteResult:
+    """Compact route: node and edge indices as NumPy arrays, geometry derived on first access.
+
+    Behaves like the route dicts used by the GUI and dashboard (route['total_distance'],
+    route.get('coordinates'), ...). Keys outside KEYS are kept in a small extra dict. The graph
+    is looked up by signature, so pickled results stay small and resolve again in any process
+    that has loaded the same network.
+    """
+
+    KEYS = ('path', 'coordinates', 'total_distance', 'estimated_time', 'congestion_level', 'congestion_score',
+            'route_quality', 'start_location', 'end_location', 'mode', 'route_index')
+    _FIELDS = ('nodes', 'edges', 'signature', 'total_distance', 'estimated_time', 'congestion_level', 'congestion_score',
+               'route_quality', 'start_location', 'end_location', 'mode', 'route_index', 'extra')
+    __slots__ = _FIELDS + ('_coordinates', '_geometry')
+
+    _networks = {}  # signature graf -> RoutingGraph yang dimuat di proses ini
+
+    def __init__(self, network, nodes, edges, total_distance, estimated_time, congestion_level, route_quality,
+                 start_location, end_location, mode, route_index=1, congestion_score=None):
+        self.register_network(network)
+        self.signature = network.signature()
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.edges = np.asarray(edges, dtype=np.int32)
+        self.total_distance = total_distance
+        self.estimated_time = estimated_time
+        self.congestion_level = congestion_level
+        self.congestion_score = congestion_score
+        self.route_quality = route_quality
+        self.start_location = start_location
+        self.end_location = end_location
+        self.mode = mode
+        self.route_index = route_index
+        self.extra = None
+        self._coordinates = None
+        self._geometry = None
+
+    @classmethod
+    def register_network(cls, network):
+        cls._networks.setdefault(network.signature(), network)
+
+    @property
+    def network(self):
+        network = self._networks.get(self.signature)
+        if network is None:
+            raise LookupError("Graf untuk rute ini belum dimuat di proses ini")
+        return network
+
+    @property
+    def path(self):
+        """OSM node ids along the route"""
+        return self.network.node_ids[self.nodes].tolist()
+
+    @property
+    def coordinates(self):
+        if self._coordinates is None:
+            self._coordinates = self.network.coordinates(self.nodes)
+        return self._coordinates
+
+    def geometry(self, zoom=None):
+        """(lat, lon) array along the road shape, simplified to about one pixel at zoom (None = full detail)"""
+        if self._geometry is None:
+            self._geometry = {}
+        if zoom not in self._geometry:
+            full = self._geometry.get(None)
+            if full is None:
+                full = self._geometry[None] = self.network.path_geometry(self.nodes, self.edges)
+            if zoom is not None:
+                self._geometry[zoom] = simplify_coordinates(full, tolerance_for_zoom(zoom, full[:, 0].mean()))
+        return self._geometry[zoom]
+
+    def encoded_polyline(self, zoom=None):
+        return encode_polyline(self.geometry(zoom))
+
+    def geojson(self, zoom=None):
+        return to_geojson(self.geometry(zoom), {key: self[key] for key in self.KEYS[2:]})
+
+    @property
+    def polyline(self):
+        return self.encoded_polyline()
+
+    def __getitem__(self, key):
+        if key in self.KEYS:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self.KEYS and key not in ('path', 'coordinates'):
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.KEYS or (self.extra is not None and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (KeyError, LookupError):
+            return default
+
+    def keys(self):
+        return list(self.KEYS) + (list(self.extra) if self.extra else [])
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __getstate__(self):
+        # Geometri tidak ikut dipickle; dihitung ulang dari graf saat dibutuhkan
+        return tuple(getattr(self, name) for name in self._FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(self._FIELDS, state):
+            setattr(self, name, value)
+        self._coordinates = None
+        self._geometry = None
+
+    def __repr__(self):
+        return (f"RouteResult({self.start_location!r} -> {self.end_location!r}, {self.mode}, "
+                f"{self.total_distance:.2f} km, {self.estimated_time:.2f} menit, {len(self.nodes)} node)")
@@ -0,0 +1,624 @@
+import heapq
+import logging
+import math
+import os
+import zlib
+import numpy as np
+from spatial_index import GridIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class LowerBound:
+    """A* potential toward one node (from it with reverse=True), evaluated per node on first lookup.
+
+    bound[v] is scale x straight-line km, raised to alt_scale x the ALT landmark bound where that
+    is larger; the maximum of two consistent potentials is still consistent. Searches only touch
+    a small part of the graph, so nothing is computed for the nodes they never reach.
+    """
+
+    def __init__(self, graph, node, scale, landmarks=None, alt_scale=0.0, reverse=False):
+        self._px, self._py = graph.coordinate_lists()
+        self._x0, self._y0 = self._px[node], self._py[node]
+        self._scale = scale
+        self._alt_scale = alt_scale
+        # Lihat Landmarks: batas ke node = max(baris node - baris v), dari node = max(baris v - baris node)
+        self._distances = landmarks.distances if landmarks is not None and alt_scale > 0 else None
+        self._row = self._distances[node] if self._distances is not None else None
+        self._reverse = reverse
+        self._cache = {}
+
+    def __getitem__(self, v):
+        bound = self._cache.get(v)
+        if bound is None:
+            bound = self._scale * math.hypot(self._px[v] - self._x0, self._py[v] - self._y0)
+            if self._distances is not None:
+                alt = float((self._distances[v] - self._row).max() if self._reverse
+                            else (self._row - self._distances[v]).max())
+                if alt != alt or alt == math.inf:
+                    alt = 0.0  # Landmark tak terjangkau (NaN) tidak memberi batas
+                bound = max(bound, self._alt_scale * alt)
+            self._cache[v] = bound
+        return bound
+
+
+class RoutingGraph:
+    """Compact CSR road graph: contiguous node indices and per-edge NumPy arrays"""
+
+    # Array yang disimpan di artefak biner; turunan (sources, in_edges, in_offsets) ikut disimpan agar load tidak perlu sort
+    ARTIFACT_ARRAYS = ('node_ids', 'x', 'y', 'offsets', 'targets', 'length', 'speed_limit', 'preference',
+                       'base_weight', 'sources', 'in_edges', 'in_offsets')
+    # Titik bentuk OSM di antara ujung-ujung edge e: geom_x/geom_y[geom_offsets[e]:geom_offsets[e + 1]] (opsional)
+    GEOMETRY_ARRAYS = ('geom_offsets', 'geom_x', 'geom_y')
+
+    def __init__(self, node_ids, x, y, offsets, targets, length, speed_limit, preference, weight=None,
+                 sources=None, in_edges=None, in_offsets=None):
+        # Node i punya OSM id node_ids[i]; node_ids terurut sehingga lookup cukup dengan searchsorted
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.x = np.asarray(x, dtype=np.float64)  # longitude
+        self.y = np.asarray(y, dtype=np.float64)  # latitude
+        # Edge dari node u ada di rentang offsets[u]:offsets[u + 1]
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        if sources is None:
+            sources = np.repeat(np.arange(len(self.node_ids), dtype=np.int32), np.diff(self.offsets))
+        self.sources = np.asarray(sources, dtype=np.int32)
+        self.length = np.asarray(length, dtype=np.float64)  # meter
+        self.speed_limit = np.asarray(speed_limit, dtype=np.float32)
+        self.preference = np.asarray(preference, dtype=np.float32)
+        # base_weight tidak pernah diubah; update traffic selalu dihitung ulang dari sini
+        self.base_weight = np.asarray(weight, dtype=np.float64) if weight is not None else self.length / 1000
+        self.weight = self.base_weight.copy()
+        # Edge masuk ke node v ada di in_edges[in_offsets[v]:in_offsets[v + 1]] (untuk pencarian mundur)
+        if in_edges is None or in_offsets is None:
+            in_edges = np.argsort(self.targets, kind='stable')
+            in_offsets = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.targets, minlength=len(self.node_ids)), out=in_offsets[1:])
+        self.in_edges = np.asarray(in_edges, dtype=np.int64)
+        self.in_offsets = np.asarray(in_offsets, dtype=np.int64)
+        # Koordinat proyeksi equirectangular (km) untuk heuristik A*
+        self._km_per_degree = EARTH_RADIUS_KM * np.pi / 180
+        self._km_per_degree_lon = np.cos(np.radians(self.y.mean() if len(self.y) else 0.0)) * self._km_per_degree
+        self.px, self.py = self.project(self.y, self.x)
+        self._straight_km = None
+        self._coordinate_lists = None
+        self._td_bound_cache = (None, None, None)  # (edge_minutes, profiles, bobot batas bawah) terakhir
+        self._scale_cache = (None, 0.0)  # (vektor bobot, skala) terakhir; vektor bobot tidak pernah diubah di tempat
+        self._signature = None
+        self._spatial_index = None
+        self.geom_offsets = self.geom_x = self.geom_y = None
+
+    @classmethod
+    def from_networkx(cls, G, default_speed=40):
+        """Relabel a cleaned nx.DiGraph to contiguous ints and pack its edges into CSR arrays"""
+        node_ids = np.array(sorted(G.nodes), dtype=np.int64)
+        x = np.array([G.nodes[n]['x'] for n in node_ids.tolist()], dtype=np.float64)
+        y = np.array([G.nodes[n]['y'] for n in node_ids.tolist()], dtype=np.float64)
+
+        num_edges = G.number_of_edges()
+        src = np.empty(num_edges, dtype=np.int64)
+        dst = np.empty(num_edges, dtype=np.int64)
+        weight = np.empty(num_edges, dtype=np.float64)
+        speed_limit = np.empty(num_edges, dtype=np.float32)
+        preference = np.empty(num_edges, dtype=np.float32)
+        shape_points = [None] * num_edges
+        for i, (u, v, data) in enumerate(G.edges(data=True)):
+            src[i] = u
+            dst[i] = v
+            weight[i] = data.get('weight', 1.0)
+            speed_limit[i] = data.get('speed_limit', default_speed)
+            preference[i] = data.get('preference', 1.0)
+            geometry = data.get('geometry')
+            if geometry is not None and hasattr(geometry, 'coords'):
+                shape_points[i] = np.asarray(geometry.coords, dtype=np.float64)[1:-1, :2]
+
+        src = np.searchsorted(node_ids, src)
+        dst = np.searchsorted(node_ids, dst)
+        order = np.lexsort((dst, src))
+        counts = np.bincount(src, minlength=len(node_ids))
+        offsets = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        # Bobot hasil pembersihan = panjang (km), jadi panjang dasar disimpan dalam meter
+        graph = cls(node_ids, x, y, offsets, dst[order], weight[order] * 1000,
+                    speed_limit[order], preference[order], weight[order])
+        if any(points is not None and len(points) for points in shape_points):
+            empty = np.empty((0, 2))
+            ordered = [shape_points[i] if shape_points[i] is not None else empty for i in order.tolist()]
+            graph.geom_offsets = np.zeros(num_edges + 1, dtype=np.int64)
+            np.cumsum([len(points) for points in ordered], out=graph.geom_offsets[1:])
+            points = np.concatenate(ordered) if graph.geom_offsets[-1] else empty
+            graph.geom_x, graph.geom_y = points[:, 0].copy(), points[:, 1].copy()
+        return graph
+
+    def save(self, directory):
+        """Write every array as a raw .npy file so load() can memory-map them"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARTIFACT_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        if self.geom_offsets is not None:
+            for name in self.GEOMETRY_ARRAYS:
+                np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        self.spatial_index().save(directory)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open a saved graph; with mmap the arrays are read-only pages shared between processes"""
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r' if mmap else None)
+                  for name in cls.ARTIFACT_ARRAYS}
+        graph = cls(arrays['node_ids'], arrays['x'], arrays['y'], arrays['offsets'], arrays['targets'],
+                    arrays['length'], arrays['speed_limit'], arrays['preference'], arrays['base_weight'],
+                    arrays['sources'], arrays['in_edges'], arrays['in_offsets'])
+        graph._spatial_index = GridIndex.load(directory, graph.px, graph.py, graph.signature())
+        if all(os.path.exists(os.path.join(directory, f"{name}.npy")) for name in cls.GEOMETRY_ARRAYS):
+            for name in cls.GEOMETRY_ARRAYS:
+                setattr(graph, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r' if mmap else None))
+        return graph
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def traffic_weights(self, congestion, avg_speed, weather_intensity, observed):
+        """New weight vector from per-edge traffic vectors in one NumPy pass.
+
+        weight = base weight x (1 + congestion) x speed factor x weather factor x preference
+        on observed edges; every other edge keeps its base weight.
+        """
+        speed_factor = np.maximum(0.5, self.speed_limit / np.maximum(avg_speed, 5))
+        factor = (1 + congestion) * speed_factor * (1 + weather_intensity * 0.1) * self.preference
+        return np.where(observed, self.base_weight * factor, self.base_weight)
+
+    def signature(self):
+        """Checksum of the topology, used to tell whether derived data still fits this graph"""
+        if self._signature is None:
+            crc = zlib.crc32(self.node_ids.tobytes())
+            crc = zlib.crc32(self.offsets.tobytes(), crc)
+            self._signature = zlib.crc32(self.targets.tobytes(), crc)
+        return self._signature
+
+    def index_of(self, node_id):
+        """OSM node id -> contiguous index, or -1 if the node is not in the graph"""
+        i = int(np.searchsorted(self.node_ids, node_id))
+        if i < len(self.node_ids) and self.node_ids[i] == node_id:
+            return i
+        return -1
+
+    def has_node(self, node_id):
+        return self.index_of(node_id) >= 0
+
+    def edge_between(self, u, v):
+        """Edge index for u -> v (both contiguous indices), or -1"""
+        a, b = self.offsets[u], self.offsets[u + 1]
+        hit = np.flatnonzero(self.targets[a:b] == v)
+        return int(a + hit[0]) if len(hit) else -1
+
+    def path_edges(self, nodes):
+        """Edge indices along a node-index path in one vectorized lookup; -1 marks a missing edge"""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        edges = np.full(max(len(nodes) - 1, 0), -1, dtype=np.int64)
+        if len(edges) == 0:
+            return edges
+        tails, heads = nodes[:-1], nodes[1:]
+        starts = self.offsets[tails]
+        counts = self.offsets[tails + 1] - starts
+        # Semua edge keluar dari tiap tail diratakan, lalu dicocokkan dengan head-nya
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = np.repeat(starts, counts) + np.arange(int(counts.sum())) - first
+        owner = np.repeat(np.arange(len(tails)), counts)
+        hit = self.targets[candidates] == heads[owner]
+        steps, first_hit = np.unique(owner[hit], return_index=True)
+        edges[steps] = candidates[hit][first_hit]
+        return edges
+
+    def incident_edges(self, node):
+        """Indices of every edge leaving or entering node"""
+        outgoing = np.arange(self.offsets[node], self.offsets[node + 1], dtype=np.int64)
+        return np.concatenate((outgoing, self.in_edges[self.in_offsets[node]:self.in_offsets[node + 1]]))
+
+    def neighbourhood_edges(self, node, hops=1):
+        """Edges incident to any node fewer than hops steps away (hops=1: only node's own edges)"""
+        frontier, seen, edges = [node], {node}, []
+        for _ in range(hops):
+            next_frontier = []
+            for u in frontier:
+                incident = self.incident_edges(u)
+                edges.append(incident)
+                for v in np.concatenate((self.targets[incident], self.sources[incident])).tolist():
+                    if v not in seen:
+                        seen.add(v)
+                        next_frontier.append(v)
+            frontier = next_frontier
+        return np.unique(np.concatenate(edges)) if edges else np.array([], dtype=np.int64)
+
+    def coordinates(self, nodes):
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return list(zip(self.y[nodes].tolist(), self.x[nodes].tolist()))
+
+    def path_geometry(self, nodes, edges):
+        """(n, 2) array of (lat, lon) along a path, including OSM shape points of its edges"""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        edges = np.asarray(edges, dtype=np.int64)
+        if self.geom_offsets is None or len(edges) != len(nodes) - 1 or len(edges) == 0:
+            return np.column_stack((self.y[nodes], self.x[nodes]))
+        starts = self.geom_offsets[edges]
+        counts = self.geom_offsets[edges + 1] - starts
+        # Tiap edge menyumbang node awalnya diikuti titik bentuknya; node terakhir ditambahkan di akhir
+        sizes = counts + 1
+        total = int(sizes.sum())
+        position = np.cumsum(sizes) - sizes
+        lat = np.empty(total + 1)
+        lon = np.empty(total + 1)
+        lat[position] = self.y[nodes[:-1]]
+        lon[position] = self.x[nodes[:-1]]
+        shape = np.ones(total, dtype=bool)
+        shape[position] = False
+        points = np.repeat(starts, counts) + np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        lat[:-1][shape] = self.geom_y[points]
+        lon[:-1][shape] = self.geom_x[points]
+        lat[-1], lon[-1] = self.y[nodes[-1]], self.x[nodes[-1]]
+        return np.column_stack((lat, lon))
+
+    def project(self, lat, lon):
+        """Equirectangular km coordinates, the same projection as px/py"""
+        return np.asarray(lon) * self._km_per_degree_lon, np.asarray(lat) * self._km_per_degree
+
+    def spatial_index(self):
+        """Grid index over nodes that have both incoming and outgoing edges, built on first use"""
+        if self._spatial_index is None:
+            out_degree = np.diff(self.offsets)
+            in_degree = np.bincount(self.targets, minlength=self.num_nodes)
+            candidates = np.flatnonzero((out_degree > 0) & (in_degree > 0))
+            if len(candidates) == 0:
+                candidates = np.arange(self.num_nodes)
+            self._spatial_index = GridIndex.build(self.px, self.py, candidates, signature=self.signature())
+        return self._spatial_index
+
+    def nearest_nodes(self, lats, lons):
+        """Snap a batch of coordinates; returns node indices and snapping distances in km"""
+        qx, qy = self.project(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+        return self.spatial_index().nearest(qx, qy)
+
+    def nearest_node(self, lat, lon):
+        """Index of the closest node that has both incoming and outgoing edges"""
+        nodes, _ = self.nearest_nodes([lat], [lon])
+        return int(nodes[0])
+
+    def heuristic_scale(self, weight=None, penalties=None):
+        """Largest factor k with weight[e] >= k * straight-line km of e for every edge.
+
+        k * straight-line distance is then a consistent lower bound in the same units as weight,
+        whatever traffic, penalty or preference factors went into it. The scan over every edge
+        runs once per weight vector (snapshot), not once per query.
+        """
+        weight = self.weight if weight is None else weight
+        # Overlay penalti hanya mengalikan bobot; faktor < 1 menurunkan batas bawah
+        discount = min(1.0, min(penalties.values())) if penalties else 1.0
+        cached, scale = self._scale_cache
+        if cached is not weight:
+            if self._straight_km is None:
+                self._straight_km = np.hypot(self.px[self.targets] - self.px[self.sources],
+                                             self.py[self.targets] - self.py[self.sources])
+            valid = self._straight_km > 0
+            scale = max(0.0, float(np.min(weight[valid] / self._straight_km[valid]))) if valid.any() else 0.0
+            self._scale_cache = (weight, scale)
+        return scale * discount
+
+    def coordinate_lists(self):
+        """px, py as Python lists for per-node lookups inside the search loops"""
+        if self._coordinate_lists is None:
+            self._coordinate_lists = (self.px.tolist(), self.py.tolist())
+        return self._coordinate_lists
+
+    def distance_km(self, node, others=None):
+        """Straight-line km from node to every node (or to the given node indices)"""
+        px, py = (self.px, self.py) if others is None else (self.px[others], self.py[others])
+        return np.hypot(px - self.px[node], py - self.py[node])
+
+    def lower_bound_potential(self, target, weight=None, penalties=None, landmarks=None):
+        """Per-node admissible A* estimate of the remaining cost to target"""
+        return self._lower_bounds(target, weight, penalties, landmarks)
+
+    def _lower_bounds(self, node, weight=None, penalties=None, landmarks=None, reverse=False):
+        """Lazy admissible bound on the cost to node (from node with reverse=True)"""
+        weight = self.weight if weight is None else weight
+        alt_scale = landmarks.scale(self, weight, penalties) if landmarks is not None else 0.0
+        return LowerBound(self, node, self.heuristic_scale(weight, penalties), landmarks, alt_scale, reverse)
+
+    def shortest_path(self, source, target, weight=None, potential=None, stats=None, penalties=None):
+        """A* (Dijkstra if potential is None) over the CSR arrays.
+
+        potential is a per-node list of lower bounds on the remaining cost to target.
+        penalties is a sparse {edge index: multiplier} overlay applied on top of weight, so
+        penalised searches never need a modified copy of the weights.
+        Returns (node indices, edge indices, cost), or (None, None, inf) if target is unreachable.
+        """
+        weight = self.weight if weight is None else weight
+        offsets, targets = self.offsets, self.targets
+        dist = {source: 0.0}
+        pred_edge = {}
+        settled = set()
+        heap = [(potential[source] if potential is not None else 0.0, 0.0, source)]
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if u == target:
+                break
+            a, b = offsets[u], offsets[u + 1]
+            costs = weight[a:b].tolist()
+            if penalties:
+                costs = [w * penalties.get(e, 1.0) for e, w in zip(range(a, b), costs)]
+            for e, v, w in zip(range(a, b), targets[a:b].tolist(), costs):
+                nd = d + w
+                if nd < dist.get(v, np.inf):
+                    dist[v] = nd
+                    pred_edge[v] = e
+                    heapq.heappush(heap, (nd + (potential[v] if potential is not None else 0.0), nd, v))
+
+        if stats is not None:
+            stats['settled'] = len(settled)
+        if target not in settled:
+            return None, None, np.inf
+        edges = self._trace_back(pred_edge, source, target, self.sources)
+        return self._path_from_edges(source, edges), edges, dist[target]
+
+    def astar(self, source, target, weight=None, stats=None, penalties=None, landmarks=None):
+        potential = self.lower_bound_potential(target, weight, penalties, landmarks)
+        return self.shortest_path(source, target, weight, potential, stats, penalties)
+
+    def bidirectional_astar(self, source, target, weight=None, stats=None, penalties=None, landmarks=None):
+        """Bidirectional A* with the symmetric (average) potential of both lower bounds"""
+        weight = self.weight if weight is None else weight
+        if source == target:
+            if stats is not None:
+                stats['settled'] = 1
+            return np.array([source], dtype=np.int64), np.array([], dtype=np.int64), 0.0
+        # Kunci maju d + p(v) dan kunci mundur d - p(v): jumlah keduanya = panjang jalur lewat v
+        to_target = self._lower_bounds(target, weight, penalties, landmarks)
+        from_source = self._lower_bounds(source, weight, penalties, landmarks, reverse=True)
+        potential = {source: 0.5 * to_target[source], target: -0.5 * from_source[target]}
+        dist = ({source: 0.0}, {target: 0.0})
+        pred_edge = ({}, {})
+        settled = (set(), set())
+        heaps = ([(potential[source], 0.0, source)], [(-potential[target], 0.0, target)])
+        sign = (1.0, -1.0)
+        best, meeting = np.inf, -1
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            _, d, u = heapq.heappop(heaps[side])
+            if u in settled[side]:
+                continue
+            settled[side].add(u)
+            if side == 0:
+                a, b = self.offsets[u], self.offsets[u + 1]
+                edges = range(a, b)
+                heads = self.targets[a:b].tolist()
+                costs = weight[a:b].tolist()
+            else:
+                a, b = self.in_offsets[u], self.in_offsets[u + 1]
+                edges = self.in_edges[a:b].tolist()
+                heads = self.sources[edges].tolist()
+                costs = weight[edges].tolist()
+            if penalties:
+                costs = [w * penalties.get(e, 1.0) for e, w in zip(edges, costs)]
+            for e, v, w in zip(edges, heads, costs):
+                nd = d + w
+                if nd < dist[side].get(v, np.inf):
+                    dist[side][v] = nd
+                    pred_edge[side][v] = e
+                    p = potential.get(v)
+                    if p is None:
+                        p = potential[v] = 0.5 * (to_target[v] - from_source[v])
+                    heapq.heappush(heaps[side], (nd + sign[side] * p, nd, v))
+                    other = dist[1 - side].get(v)
+                    if other is not None and nd + other < best:
+                        best, meeting = nd + other, v
+
+        if stats is not None:
+            stats['settled'] = len(settled[0]) + len(settled[1])
+        if meeting < 0:
+            return None, None, np.inf
+        forward = self._trace_back(pred_edge[0], source, meeting, self.sources)
+        backward = self._trace_back(pred_edge[1], target, meeting, self.targets)[::-1]
+        edges = np.concatenate((forward, backward))
+        return self._path_from_edges(source, edges), edges, best
+
+    def time_dependent_path(self, source, target, edge_minutes, profiles, departure_minute, stats=None, penalties=None,
+                            landmarks=None):
+        """Fastest path when each edge's time depends on the time of day it is entered.
+
+        The cost of edge e reached t minutes after departure is
+        edge_minutes[e] * profiles.factors[e, bucket(departure_minute + t)]. The A* bound uses each
+        edge's smallest factor, so it stays admissible for every departure time.
+        Returns (node indices, edge indices, travel minutes), or (None, None, inf).
+        """
+        factors, bucket_minutes, num_buckets = profiles.factors, profiles.bucket_minutes, profiles.num_buckets
+        cached_minutes, cached_profiles, bound_weight = self._td_bound_cache
+        if cached_minutes is not edge_minutes or cached_profiles is not profiles:
+            bound_weight = edge_minutes * profiles.min_factor
+            self._td_bound_cache = (edge_minutes, profiles, bound_weight)
+        potential = self.lower_bound_potential(target, bound_weight, penalties, landmarks)
+        offsets, targets = self.offsets, self.targets
+        dist = {source: 0.0}
+        pred_edge = {}
+        settled = set()
+        heap = [(potential[source], 0.0, source)]
+        while heap:
+            _, t, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            settled.add(u)
+            if u == target:
+                break
+            a, b = offsets[u], offsets[u + 1]
+            bucket = int((departure_minute + t) // bucket_minutes) % num_buckets
+            costs = (edge_minutes[a:b] * factors[a:b, bucket]).tolist()
+            if penalties:
+                costs = [w * penalties.get(e, 1.0) for e, w in zip(range(a, b), costs)]
+            for e, v, w in zip(range(a, b), targets[a:b].tolist(), costs):
+                nt = t + w
+                if nt < dist.get(v, np.inf):
+                    dist[v] = nt
+                    pred_edge[v] = e
+                    heapq.heappush(heap, (nt + potential[v], nt, v))
+
+        if stats is not None:
+            stats['settled'] = len(settled)
+        if target not in settled:
+            return None, None, np.inf
+        edges = self._trace_back(pred_edge, source, target, self.sources)
+        return self._path_from_edges(source, edges), edges, dist[target]
+
+    def time_dependent_minutes(self, edges, path_minutes, profiles, departure_minute):
+        """Travel time along an edge sequence (path_minutes[i] is edge i's free-flow time), each edge evaluated at its entry time"""
+        t = 0.0
+        for e, minutes in zip(np.asarray(edges).tolist(), np.asarray(path_minutes).tolist()):
+            bucket = int((departure_minute + t) // profiles.bucket_minutes) % profiles.num_buckets
+            t += minutes * float(profiles.factors[e, bucket])
+        return t
+
+    def bounded_dijkstra(self, sources, weight=None, limit=np.inf, reverse=False, potential=None):
+        """One-to-many Dijkstra from one or more source nodes, stopping at cost limit.
+
+        With reverse=True edges are followed backwards, so dist[v] is the cost from v to the
+        nearest source. potential (per-node lower bounds on the rest of a route) prunes nodes
+        with dist + potential > limit; every node on a route within limit is still settled
+        exactly. Returns (dist, pred_edge) dicts over every settled node.
+        """
+        weight = self.weight if weight is None else weight
+        if reverse:
+            offsets, edge_ids, heads = self.in_offsets, self.in_edges, self.sources
+        else:
+            offsets, edge_ids, heads = self.offsets, None, self.targets
+        dist = {}
+        pred_edge = {}
+        heap = [(0.0, int(s)) for s in np.atleast_1d(sources).tolist()]
+        heapq.heapify(heap)
+        best = {s: 0.0 for _, s in heap}
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in dist:
+                continue
+            if d > limit:
+                break
+            if potential is not None and d + potential[u] > limit:
+                continue
+            dist[u] = d
+            a, b = offsets[u], offsets[u + 1]
+            edges = slice(a, b) if edge_ids is None else edge_ids[a:b]
+            ids = range(a, b) if edge_ids is None else edges.tolist()
+            for e, v, w in zip(ids, heads[edges].tolist(), weight[edges].tolist()):
+                nd = d + w
+                if v not in dist and nd < best.get(v, np.inf):
+                    best[v] = nd
+                    pred_edge[v] = e
+                    heapq.heappush(heap, (nd, v))
+        return dist, pred_edge
+
+    def shortest_path_tree(self, source, weight=None, reverse=False, limit=np.inf, potential=None):
+        """Single-source tree as dense arrays: dist (inf = unreachable) and pred_edge (-1 = root/unreached)"""
+        settled, pred = self.bounded_dijkstra(source, weight, limit=limit, reverse=reverse, potential=potential)
+        dist = np.full(self.num_nodes, np.inf)
+        dist[np.fromiter(settled.keys(), dtype=np.int64, count=len(settled))] = list(settled.values())
+        pred_edge = np.full(self.num_nodes, -1, dtype=np.int32)
+        pred_edge[np.fromiter(pred.keys(), dtype=np.int64, count=len(pred))] = list(pred.values())
+        pred_edge[np.isinf(dist)] = -1  # Node yang hanya ditemukan, belum di-settle sebelum batas
+        return dist, pred_edge
+
+    def plateau_alternatives(self, source, target, weight=None, count=2, primary_edges=None, max_stretch=1.3,
+                             max_overlap=0.7, min_plateau=0.1, stats=None, landmarks=None):
+        """Up to count alternative paths from one forward and one backward shortest-path tree.
+
+        A plateau is a chain of edges that lie in both trees; the path through it (source tree
+        up to its start, target tree from its end) is a shortest path along the whole plateau, so
+        long plateaus give locally optimal detours. Candidates must cost at most max_stretch x
+        the optimum, have a plateau of at least min_plateau x the optimum, be simple, and share
+        at most max_overlap of their cost with the primary path and earlier picks.
+        Returns a list of (node indices, edge indices, cost), cheapest first.
+        """
+        weight = self.weight if weight is None else weight
+        limit = max_stretch * float(weight[primary_edges].sum()) if primary_edges is not None else np.inf
+        # Pohon mundur dipangkas batas bawah dari source; pohon maju dipangkas jarak pasti ke target
+        if np.isfinite(limit):
+            to_source = self._lower_bounds(source, weight, landmarks=landmarks, reverse=True)
+            dist_b, pred_b = self.shortest_path_tree(target, weight, reverse=True, limit=limit, potential=to_source)
+            dist_f, pred_f = self.shortest_path_tree(source, weight, limit=limit, potential=dist_b.tolist())
+        else:
+            dist_b, pred_b = self.shortest_path_tree(target, weight, reverse=True)
+            dist_f, pred_f = self.shortest_path_tree(source, weight)
+        if stats is not None:
+            stats['settled'] = int(np.isfinite(dist_f).sum() + np.isfinite(dist_b).sum())
+        best = dist_f[target]
+        if not np.isfinite(best) or source == target:
+            return []
+
+        # Edge plateau: edge pohon maju ke head-nya sekaligus edge pohon mundur dari tail-nya
+        reached = np.flatnonzero(np.isfinite(dist_f) & np.isfinite(dist_b))
+        tree_edges = pred_f[reached]
+        tree_edges = tree_edges[tree_edges >= 0]
+        plateau_edges = tree_edges[pred_b[self.sources[tree_edges]] == tree_edges]
+        on_plateau_in = np.zeros(self.num_nodes, dtype=bool)
+        on_plateau_in[self.targets[plateau_edges]] = True
+        # Setiap node punya paling banyak satu edge plateau masuk dan keluar, jadi plateau berupa rantai
+        starts = np.unique(self.sources[plateau_edges][~on_plateau_in[self.sources[plateau_edges]]])
+        candidates = []
+        for u in starts.tolist():
+            cost = dist_f[u] + dist_b[u]
+            if cost > max_stretch * best:
+                continue
+            v, length = u, 0.0
+            while True:
+                e = pred_b[v]
+                if e < 0 or pred_f[self.targets[e]] != e:
+                    break
+                length += weight[e]
+                v = int(self.targets[e])
+            if length >= min_plateau * best:
+                candidates.append((cost, u))
+
+        chosen = []
+        used = np.zeros(self.num_edges, dtype=bool)
+        if primary_edges is not None:
+            used[primary_edges] = True
+        for cost, u in sorted(candidates):
+            if len(chosen) >= count:
+                break
+            head = self._trace_back(pred_f, source, u, self.sources)
+            tail = self._trace_back(pred_b, target, u, self.targets)[::-1]
+            edges = np.concatenate((head, tail)).astype(np.int64)
+            nodes = self._path_from_edges(source, edges)
+            if len(np.unique(nodes)) != len(nodes):
+                continue  # Jalur via u memutar kembali ke node yang sama
+            if weight[edges][used[edges]].sum() > max_overlap * cost:
+                continue
+            used[edges] = True
+            chosen.append((nodes, edges, float(cost)))
+        return chosen
+
+    def tree_path(self, pred_edge, source, target):
+        """(nodes, edges) from source to target in a tree from shortest_path_tree"""
+        edges = self._trace_back(pred_edge, source, target, self.sources)
+        return self._path_from_edges(source, edges), edges
+
+    @staticmethod
+    def _trace_back(pred_edge, root, node, tails):
+        edges = []
+        while node != root:
+            e = pred_edge[node]
+            edges.append(e)
+            node = int(tails[e])
+        edges.reverse()
+        return np.array(edges, dtype=np.int64)
+
+    def _path_from_edges(self, source, edges):
+        return np.concatenate(([source], self.targets[edges])).astype(np.int64)
@@ -0,0 +1,117 @@
+import logging
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from routing_graph import RoutingGraph
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class SharedGraph:
+    """RoutingGraph arrays published once in multiprocessing.shared_memory for routing workers.
+
+    The parent copies the topology, coordinates and optional extras (landmarks) into named
+    blocks; workers attach with attach(spec) and build a RoutingGraph over zero-copy views.
+    Traffic weights live in two slots: write() fills the inactive slot and then flips one
+    integer, so every worker sees the new epoch on its next query. A query that pinned the
+    other slot checks is_current() afterwards and retries if the slot was reused meanwhile.
+    """
+
+    def __init__(self, blocks, arrays, locations, owner):
+        self._blocks = blocks
+        self.arrays = arrays
+        self.locations = locations  # lokasi -> OSM node id, agar worker tidak perlu snapping
+        self.owner = owner
+
+    @classmethod
+    def publish(cls, graph, locations, extras=None):
+        arrays = {name: getattr(graph, name) for name in RoutingGraph.ARTIFACT_ARRAYS}
+        if graph.geom_offsets is not None:
+            arrays.update((name, getattr(graph, name)) for name in RoutingGraph.GEOMETRY_ARRAYS)
+        arrays.update(extras or {})
+        arrays['weight_slots'] = np.tile(np.asarray(graph.weight, dtype=np.float64), (2, 1))
+        arrays['congestion_slots'] = np.full((2, graph.num_edges), np.nan, dtype=np.float32)
+        arrays['slot_state'] = np.array([0, 0, -1], dtype=np.int64)  # [slot aktif, epoch slot 0, epoch slot 1]
+        blocks, views = {}, {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks[name] = block
+                views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+                views[name][...] = array
+        except Exception:
+            cls(blocks, views, locations, owner=True).close()
+            raise
+        total = sum(view.nbytes for view in views.values()) / 2 ** 20
+        logging.info(f"✅ Graf {graph.num_nodes} node dipublikasikan ke shared memory ({total:.1f} MB)")
+        return cls(blocks, views, dict(locations), owner=True)
+
+    def spec(self):
+        """Picklable description that attach() uses in a worker process"""
+        layout = {name: (self._blocks[name].name, view.dtype.str, view.shape) for name, view in self.arrays.items()}
+        return {'arrays': layout, 'locations': self.locations}
+
+    @classmethod
+    def attach(cls, spec):
+        blocks, views = {}, {}
+        for name, (block_name, dtype, shape) in spec['arrays'].items():
+            block = shared_memory.SharedMemory(name=block_name)
+            blocks[name] = block
+            views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return cls(blocks, views, spec['locations'], owner=False)
+
+    def graph(self):
+        """RoutingGraph over the shared arrays (no copies of the CSR or coordinate arrays)"""
+        a = self.arrays
+        graph = RoutingGraph(a['node_ids'], a['x'], a['y'], a['offsets'], a['targets'], a['length'],
+                             a['speed_limit'], a['preference'], a['base_weight'], a['sources'], a['in_edges'],
+                             a['in_offsets'])
+        if all(name in a for name in RoutingGraph.GEOMETRY_ARRAYS):
+            graph.geom_offsets, graph.geom_x, graph.geom_y = (a[name] for name in RoutingGraph.GEOMETRY_ARRAYS)
+        _, _, graph.weight, _ = self.current()
+        return graph
+
+    def write(self, epoch, weight, congestion=None):
+        """Publish the weights of a new epoch to every attached worker"""
+        state = self.arrays['slot_state']
+        slot = 1 - int(state[0])
+        state[1 + slot] = -1  # Query yang masih memakai slot ini akan mengulang
+        self.arrays['weight_slots'][slot] = weight
+        self.arrays['congestion_slots'][slot] = np.nan if congestion is None else congestion
+        state[1 + slot] = epoch
+        state[0] = slot
+
+    def current(self, timeout=5.0):
+        """(slot, epoch, weight view, congestion view) of the active slot.
+
+        Waits in 1 ms steps while the active slot is being rewritten; raises TimeoutError if that
+        takes longer than timeout seconds (a writer that died mid-write).
+        """
+        state = self.arrays['slot_state']
+        deadline = None
+        while True:
+            slot = int(state[0])
+            epoch = int(state[1 + slot])
+            if epoch >= 0:  # -1: slot sedang ditulis ulang setelah dua update beruntun
+                return slot, epoch, self.arrays['weight_slots'][slot], self.arrays['congestion_slots'][slot]
+            if deadline is None:
+                deadline = time.monotonic() + timeout
+            elif time.monotonic() > deadline:
+                raise TimeoutError(f"Slot bobot {slot} tidak selesai ditulis dalam {timeout} detik")
+            time.sleep(0.001)
+
+    def is_current(self, slot, epoch):
+        """False if slot was rewritten since it was pinned at epoch"""
+        return int(self.arrays['slot_state'][1 + slot]) == epoch
+
+    def close(self):
+        self.arrays = {}
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                pass  # Masih ada view numpy yang hidup; blok tetap dilepas saat proses selesai
+            if self.owner:
+                block.unlink()
+        self._blocks = {}
@@ -0,0 +1,109 @@
+import logging
+import os
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class GridIndex:
+    """Uniform grid over projected node coordinates (km) for batch nearest-node snapping.
+
+    Nodes are bucketed per cell in CSR form: cell c holds cell_nodes[cell_offsets[c]:cell_offsets[c + 1]].
+    A query scans the block of cells around it and only widens the block when the best
+    candidate could still be beaten by a node outside it, so answers are exact.
+    """
+
+    FILE_NAME = "spatial_index.npz"
+
+    def __init__(self, origin, cell_km, shape, cell_offsets, cell_nodes, px, py, signature=0):
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.cell_km = float(cell_km)
+        self.shape = (int(shape[0]), int(shape[1]))  # (kolom, baris)
+        self.cell_offsets = np.asarray(cell_offsets, dtype=np.int64)
+        self.cell_nodes = np.asarray(cell_nodes, dtype=np.int64)
+        self.px = px
+        self.py = py
+        self.signature = int(signature)
+
+    @classmethod
+    def build(cls, px, py, candidates, cell_km=0.25, signature=0):
+        """Bucket the candidate node indices into cells of cell_km x cell_km"""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) == 0:
+            raise ValueError("GridIndex membutuhkan minimal satu node")
+        origin = (float(px[candidates].min()), float(py[candidates].min()))
+        cols = int((px[candidates].max() - origin[0]) // cell_km) + 1
+        rows = int((py[candidates].max() - origin[1]) // cell_km) + 1
+        cells = cls._cell_of(px[candidates], py[candidates], origin, cell_km, cols)
+        order = np.argsort(cells, kind='stable')
+        cell_offsets = np.zeros(cols * rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=cols * rows), out=cell_offsets[1:])
+        return cls(origin, cell_km, (cols, rows), cell_offsets, candidates[order], px, py, signature)
+
+    @staticmethod
+    def _cell_of(qx, qy, origin, cell_km, cols):
+        ix = ((qx - origin[0]) // cell_km).astype(np.int64)
+        iy = ((qy - origin[1]) // cell_km).astype(np.int64)
+        return iy * cols + ix
+
+    def save(self, directory):
+        np.savez(os.path.join(directory, self.FILE_NAME), origin=np.array(self.origin), cell_km=self.cell_km,
+                 shape=np.array(self.shape), cell_offsets=self.cell_offsets, cell_nodes=self.cell_nodes,
+                 signature=np.int64(self.signature))
+
+    @classmethod
+    def load(cls, directory, px, py, signature):
+        """Saved index for a graph with this signature, or None"""
+        path = os.path.join(directory, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['signature']) != signature:
+                logging.warning(f"⚠ {path} tidak cocok dengan graf saat ini, akan dibangun ulang")
+                return None
+            return cls(data['origin'], data['cell_km'], data['shape'], data['cell_offsets'], data['cell_nodes'],
+                       px, py, signature)
+
+    def nearest(self, qx, qy, max_ring=4):
+        """Nearest indexed node and its distance in km for every query point"""
+        qx = np.atleast_1d(np.asarray(qx, dtype=np.float64))
+        qy = np.atleast_1d(np.asarray(qy, dtype=np.float64))
+        best_node = np.full(len(qx), -1, dtype=np.int64)
+        best_dist = np.full(len(qx), np.inf)
+        cols, rows = self.shape
+        cx = np.floor((qx - self.origin[0]) / self.cell_km).astype(np.int64)
+        cy = np.floor((qy - self.origin[1]) / self.cell_km).astype(np.int64)
+
+        pending = np.arange(len(qx))
+        for ring in range(1, max_ring + 1):
+            if len(pending) == 0:
+                break
+            steps = np.arange(-ring, ring + 1)
+            ix = (cx[pending, None] + np.tile(steps, len(steps))).ravel()
+            iy = (cy[pending, None] + np.repeat(steps, len(steps))).ravel()
+            inside = (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+            cells = np.where(inside, iy * cols + ix, 0)
+            starts = self.cell_offsets[cells]
+            counts = np.where(inside, self.cell_offsets[cells + 1] - starts, 0)
+
+            # Semua kandidat di blok sel, diratakan ke satu array beserta pemilik query-nya
+            total = int(counts.sum())
+            if total:
+                first = np.repeat(np.cumsum(counts) - counts, counts)
+                nodes = self.cell_nodes[np.repeat(starts, counts) + np.arange(total) - first]
+                owner = np.repeat(np.repeat(pending, len(steps) ** 2), counts)
+                dist = np.hypot(self.px[nodes] - qx[owner], self.py[nodes] - qy[owner])
+                order = np.lexsort((dist, owner))
+                owners, first_hit = np.unique(owner[order], return_index=True)
+                best_node[owners] = nodes[order[first_hit]]
+                best_dist[owners] = dist[order[first_hit]]
+
+            # Node yang lebih dekat dari ring * cell_km pasti berada di dalam blok
+            pending = pending[best_dist[pending] > ring * self.cell_km]
+
+        all_nodes = self.cell_nodes
+        for q in pending.tolist():
+            dist = np.hypot(self.px[all_nodes] - qx[q], self.py[all_nodes] - qy[q])
+            best = int(np.argmin(dist))
+            best_node[q], best_dist[q] = all_nodes[best], dist[best]
+        return best_node, best_dist
@@ -0,0 +1,96 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Modul proyek ada di root repo (tanpa paket), jadi root ditambahkan ke path import
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing_graph import RoutingGraph  # noqa: E402
+from landmarks import Landmarks  # noqa: E402
+
+
+def make_graph(size=12, seed=7):
+    """Jittered grid around Bengkulu with random one-way streets and detour factors"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(size * size) * 10 + 1000
+    lon = 102.26 + (np.arange(size * size) % size) * 0.002 + rng.normal(0, 0.0003, size * size)
+    lat = -3.80 + (np.arange(size * size) // size) * 0.002 + rng.normal(0, 0.0003, size * size)
+    src, dst = [], []
+    for u in range(size * size):
+        r, c = divmod(u, size)
+        for v in ([u + 1] if c + 1 < size else []) + ([u + size] if r + 1 < size else []):
+            one_way = rng.random()
+            if one_way > 0.15:
+                src.append(u)
+                dst.append(v)
+            if one_way < 0.85:
+                src.append(v)
+                dst.append(u)
+    src, dst = np.array(src), np.array(dst)
+    order = np.lexsort((dst, src))
+    src, dst = src[order], dst[order]
+    offsets = np.zeros(size * size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=size * size), out=offsets[1:])
+    probe = RoutingGraph(ids, lon, lat, offsets, dst, np.ones(len(src)), np.full(len(src), 40.0), np.ones(len(src)))
+    km = np.hypot(probe.px[dst] - probe.px[src], probe.py[dst] - probe.py[src])
+    weight = km * rng.uniform(1.0, 1.6, len(src))
+    return RoutingGraph(ids, lon, lat, offsets, dst, km * 1000, np.full(len(src), 40.0), np.ones(len(src)), weight)
+
+
+@pytest.fixture(scope='module')
+def graph():
+    return make_graph()
+
+
+@pytest.fixture(scope='module')
+def traffic(graph):
+    """Traffic weights in the shape the engine builds them: some edges slower, the rest at base weight"""
+    rng = np.random.default_rng(3)
+    congestion = np.where(rng.random(graph.num_edges) < 0.3, rng.uniform(0.2, 2.0, graph.num_edges), 0.0)
+    return graph.base_weight * (1 + congestion)
+
+
+@pytest.fixture(scope='module')
+def landmarks(graph):
+    return Landmarks.build(graph, count=6)
+
+
+@pytest.fixture(scope='module')
+def pairs(graph):
+    rng = np.random.default_rng(11)
+    return [tuple(int(v) for v in rng.choice(graph.num_nodes, 2, replace=False)) for _ in range(60)]
+
+
+def assert_valid_path(graph, nodes, edges, cost, weight, source, target):
+    assert nodes[0] == source and nodes[-1] == target
+    assert np.array_equal(graph.path_edges(nodes), edges)
+    assert weight[edges].sum() == pytest.approx(cost)
+
+
+
+
+@pytest.fixture
+def make_engine(monkeypatch, tmp_path):
+    """Build engines of a given class on a fresh synthetic grid (traffic updates rewrite network.weight).
+
+    Runs in tmp_path, so the cache directory and saved landmark/profile files stay out of the repo.
+    """
+    route_recommendation = pytest.importorskip('route_recommendation')
+    monkeypatch.chdir(tmp_path)
+    network = make_graph()
+    locations = {f"Lokasi {i}": (float(network.y[node]), float(network.x[node]))
+                 for i, node in enumerate(range(0, network.num_nodes, 17))}
+    nodes = {name: int(network.node_ids[node]) for name, node in zip(locations, range(0, network.num_nodes, 17))}
+    monkeypatch.setattr(route_recommendation.RouteRecommendationEngine, '_load_network',
+                        lambda self, network_type: (network, dict(nodes)))
+
+    def make(engine_class='RouteRecommendationEngine', **options):
+        options = dict(dict(precompute_locations=False, use_landmarks=False), **options)
+        return getattr(route_recommendation, engine_class)(locations, **options)
+    return make
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine()
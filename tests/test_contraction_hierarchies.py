@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from contraction_hierarchies import ContractionHierarchy
+from conftest import assert_valid_path
+
+
+@pytest.fixture(scope='module')
+def hierarchy(graph):
+    return ContractionHierarchy.build(graph)
+
+
+@pytest.mark.parametrize('use_traffic', [False, True])
+def test_customized_hierarchy_matches_dijkstra(graph, traffic, hierarchy, pairs, use_traffic):
+    weight = traffic if use_traffic else graph.base_weight
+    customized = hierarchy.weights_for(weight)
+    for s, t in pairs:
+        _, _, expected = graph.shortest_path(s, t, weight)
+        nodes, edges, cost = hierarchy.shortest_path(graph, s, t, customized)
+        assert cost == pytest.approx(expected)
+        assert_valid_path(graph, nodes, edges, cost, weight, s, t)
+
+
+def test_hierarchy_round_trips_through_npz(graph, traffic, hierarchy, pairs, tmp_path):
+    path = tmp_path / 'ch.npz'
+    hierarchy.save(path)
+    loaded = ContractionHierarchy.load(path, graph)
+    customized = loaded.weights_for(traffic)
+    assert np.array_equal(customized[0], hierarchy.weights_for(traffic)[0])
+    for s, t in pairs[:10]:
+        assert loaded.shortest_path(graph, s, t, customized)[2] == pytest.approx(graph.shortest_path(s, t, traffic)[2])
+
+
+def test_engine_customizes_every_traffic_snapshot(graph, traffic, hierarchy, pairs):
+    route_recommendation = pytest.importorskip('route_recommendation')
+    engine = route_recommendation.OptimizedRouteRecommendationEngine.__new__(
+        route_recommendation.OptimizedRouteRecommendationEngine)
+    engine.contraction_hierarchy = hierarchy
+    engine.road_network = graph
+    snapshot = engine._make_snapshot(1, traffic.copy())
+    assert snapshot.ch_weight is not None
+    for s, t in pairs[:10]:
+        path = engine._shortest_path(graph, s, t, snapshot=snapshot)
+        assert traffic[graph.path_edges(path)].sum() == pytest.approx(graph.shortest_path(s, t, traffic)[2])
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point, Polygon
+
+
+@pytest.mark.parametrize('concave', [True, False])
+def test_isochrone_polygons_cover_reached_nodes(engine, monkeypatch, concave):
+    if not concave:
+        monkeypatch.delattr(shapely, 'concave_hull', raising=False)  # seperti shapely 1.8
+    result = engine.compute_isochrone(list(engine.location_nodes)[2], budgets=(3, 6))
+    network = engine.road_network
+    sizes = [len(iso['nodes']) for iso in result['isochrones']]
+    assert sizes == sorted(sizes) and sizes[0] > 0
+    for iso in result['isochrones']:
+        polygon = Polygon([(lon, lat) for lat, lon in iso['polygon']]).buffer(1e-9)
+        for lat, lon in network.coordinates(np.searchsorted(network.node_ids, iso['nodes'])):
+            assert polygon.covers(Point(lon, lat))
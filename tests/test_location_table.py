@@ -0,0 +1,43 @@
+import itertools
+import numpy as np
+import pytest
+from location_table import LocationTable
+
+
+@pytest.fixture
+def locations(graph):
+    return {f"L{i}": int(graph.node_ids[node]) for i, node in enumerate(range(0, graph.num_nodes, 13))}
+
+
+def test_location_table_refresh_matches_rebuild(graph, traffic, locations):
+    table = LocationTable(graph, locations)
+    table.refresh(0, graph.base_weight, {'car': graph.base_weight * 1.5})
+    table.refresh(1, traffic, {'car': traffic * 1.5})
+    rebuilt = LocationTable(graph, locations)
+    rebuilt.refresh(1, traffic, {'car': traffic * 1.5})
+    assert table.ready(1)
+    assert np.allclose(table.cost, rebuilt.cost)
+    assert np.allclose(table.minutes['car'], rebuilt.minutes['car'])
+    for source, target in itertools.permutations(table.nodes[:5].tolist(), 2):
+        path = table.path(source, target, 1)
+        assert path[0] == source and path[-1] == target
+        expected = rebuilt.cost[table.row_of[source], table.row_of[target]]
+        assert traffic[graph.path_edges(path)].sum() == pytest.approx(expected)
+
+
+def test_location_table_misses_other_epochs(graph, locations):
+    table = LocationTable(graph, locations)
+    table.refresh(0, graph.base_weight, {'car': graph.base_weight * 1.5})
+    source, target = table.nodes[:2].tolist()
+    assert table.path(source, target, 0) is not None
+    assert table.path(source, target, 1) is None
+    assert table.refresh(0, graph.base_weight, {'car': graph.base_weight * 1.5}) == 0
+    assert table.refresh(1, graph.base_weight.copy(), {'car': graph.base_weight * 1.5}) == 0
+    assert table.ready(1)
+
+
+def test_location_table_stores_distances_as_float32(graph, locations):
+    table = LocationTable(graph, locations)
+    table.refresh(0, graph.base_weight, {'car': graph.base_weight * 1.5})
+    assert table.dist.dtype == np.float32
+    assert np.allclose(table.dist[:, table.nodes], table.cost, rtol=1e-6)
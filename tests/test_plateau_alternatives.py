@@ -0,0 +1,17 @@
+import numpy as np
+from conftest import assert_valid_path
+
+
+def overlap(weight, edges, other):
+    return weight[np.intersect1d(edges, other)].sum() / weight[edges].sum()
+
+
+def test_plateau_alternatives_are_simple_and_bounded(graph, traffic, landmarks, pairs):
+    for s, t in pairs[:30]:
+        _, primary, best = graph.shortest_path(s, t, traffic)
+        alternatives = graph.plateau_alternatives(s, t, traffic, count=3, primary_edges=primary, landmarks=landmarks)
+        for nodes, edges, cost in alternatives:
+            assert len(np.unique(nodes)) == len(nodes)
+            assert best - 1e-9 <= cost <= 1.3 * best + 1e-9
+            assert overlap(traffic, edges, primary) <= 0.7 + 1e-9
+            assert_valid_path(graph, nodes, edges, cost, traffic, s, t)
@@ -0,0 +1,53 @@
+import os
+import time
+import pandas as pd
+import route_cache
+from route_cache import RouteCache
+
+
+def test_traffic_update_makes_older_epoch_keys_miss(engine):
+    names = list(engine.location_nodes)
+    routes = engine.get_alternative_routes(names[0], names[3], max_alternatives=3)
+    assert routes and engine.get_alternative_routes(names[0], names[3], max_alternatives=3) == routes
+    assert engine.route_cache.stats()['hits'] == 1
+
+    traffic = pd.DataFrame({'location': names[:4], 'congestion_ratio': [0.9] * 4, 'avg_speed': [10.0] * 4})
+    engine.update_traffic_conditions(traffic)
+    engine.get_alternative_routes(names[0], names[3], max_alternatives=3)
+    stats = engine.route_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 2, 2)
+
+
+def test_ttl_expiry_and_lru_eviction_update_counters(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(route_cache.time, 'monotonic', lambda: clock[0])
+    cache = RouteCache(max_entries=2, ttl_seconds=10, persistent_dir=None)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]  # 'a' jadi yang terbaru, 'b' dikeluarkan berikutnya
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    assert cache.stats()['evictions'] == 1
+
+    clock[0] += 11
+    assert cache.get('a') is None
+    stats = cache.stats()
+    assert (stats['expirations'], stats['hits'], stats['misses'], stats['size']) == (1, 1, 2, 1)
+
+
+def test_persistent_tier_is_bounded(tmp_path):
+    cache = RouteCache(persistent_dir=str(tmp_path), max_persistent_files=3, persistent_ttl_seconds=3600)
+    stale = cache._persistent_file('stale')
+    cache.put('stale', [0], persistent=True)
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    for i in range(5):
+        cache.put(i, [i], persistent=True)
+        os.utime(cache._persistent_file(i), (time.time() - 100 + i, time.time() - 100 + i))
+    cache.clear()
+
+    files = [name for name in os.listdir(tmp_path) if name.endswith('.pkl')]
+    assert len(files) <= 3
+    assert not os.path.exists(stale)
+    assert cache.get(4, persistent=True) == [4]
+    assert cache.get(0, persistent=True) is None
+    assert cache.stats()['persistent_evictions'] >= 3
@@ -0,0 +1,12 @@
+import pytest
+
+
+def test_estimate_time_for_edge_keeps_the_osm_node_signature(engine):
+    network = engine.road_network
+    edge = 5
+    u, v = int(network.node_ids[network.sources[edge]]), int(network.node_ids[network.targets[edge]])
+    minutes = network.weight[edge] / network.speed_limit[edge] * 60
+    assert engine.estimate_time_for_edge(u, v) == pytest.approx(minutes)
+    assert engine.estimate_time_for_edge(u, v, 1.5, mode='motorcycle') == pytest.approx(minutes / 0.9 * 1.5)
+    with pytest.raises(KeyError):
+        engine.estimate_time_for_edge(v, v)
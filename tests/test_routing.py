@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+from conftest import assert_valid_path
+
+
+@pytest.mark.parametrize('use_traffic', [False, True])
+def test_astar_variants_match_dijkstra(graph, traffic, landmarks, pairs, use_traffic):
+    weight = traffic if use_traffic else graph.base_weight
+    searches = {
+        'astar': lambda s, t: graph.astar(s, t, weight),
+        'astar ALT': lambda s, t: graph.astar(s, t, weight, landmarks=landmarks),
+        'bidirectional': lambda s, t: graph.bidirectional_astar(s, t, weight),
+        'bidirectional ALT': lambda s, t: graph.bidirectional_astar(s, t, weight, landmarks=landmarks),
+    }
+    for s, t in pairs:
+        _, _, expected = graph.shortest_path(s, t, weight)
+        for name, search in searches.items():
+            nodes, edges, cost = search(s, t)
+            assert cost == pytest.approx(expected), name
+            assert_valid_path(graph, nodes, edges, cost, weight, s, t)
+
+
+def test_penalised_astar_matches_penalised_dijkstra(graph, traffic, landmarks, pairs):
+    for s, t in pairs[:20]:
+        _, edges, _ = graph.shortest_path(s, t, traffic)
+        penalties = {int(e): 1.5 for e in edges}
+        _, _, expected = graph.shortest_path(s, t, traffic, penalties=penalties)
+        for landmark_set in (None, landmarks):
+            _, _, cost = graph.astar(s, t, traffic, penalties=penalties, landmarks=landmark_set)
+            assert cost == pytest.approx(expected)
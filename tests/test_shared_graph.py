@@ -0,0 +1,72 @@
+import threading
+import numpy as np
+import pytest
+import route_recommendation
+from shared_graph import SharedGraph
+
+
+@pytest.fixture
+def shared(graph):
+    parent = SharedGraph.publish(graph, {})
+    worker = SharedGraph.attach(parent.spec())
+    yield parent, worker
+    worker.close()
+    parent.close()
+
+
+def test_worker_graph_reads_the_published_weights(graph, traffic, shared):
+    parent, worker = shared
+    parent.write(1, traffic)
+    slot, epoch, weight, _ = worker.current()
+    assert epoch == 1 and np.array_equal(weight, traffic)
+    assert np.array_equal(worker.graph().targets, graph.targets)
+
+
+def test_pinned_slot_is_stale_after_two_writes(graph, traffic, shared):
+    parent, worker = shared
+    slot, epoch, _, _ = worker.current()
+    parent.write(1, traffic)
+    assert worker.is_current(slot, epoch)  # Update pertama menulis slot lain
+    parent.write(2, traffic * 2)
+    assert not worker.is_current(slot, epoch)
+    retry_slot, retry_epoch, weight, _ = worker.current()
+    assert (retry_slot, retry_epoch) == (slot, 2) and np.array_equal(weight, traffic * 2)
+
+
+def test_current_waits_for_a_slot_being_rewritten(shared):
+    parent, worker = shared
+    state = parent.arrays['slot_state']
+    state[1] = -1
+    threading.Timer(0.02, lambda: state.__setitem__(1, 7)).start()
+    assert worker.current()[1] == 7
+    state[1] = -1
+    with pytest.raises(TimeoutError):
+        worker.current(timeout=0.01)
+
+
+def test_batch_request_retries_when_its_slot_is_reused(make_engine, monkeypatch):
+    engine = make_engine('OptimizedRouteRecommendationEngine')
+    network = engine.road_network
+    parent = SharedGraph.publish(network, engine.location_nodes)
+    engine.shared_graphs = {'drive': SharedGraph.attach(parent.spec())}
+    slow = network.base_weight * 3
+    epochs = []
+    calculate = engine._calculate_routes
+
+    def calculate_during_updates(*args):
+        epochs.append(engine.snapshot.epoch)
+        if len(epochs) == 1:  # Dua update induk selama query pertama menimpa slot yang dipakai
+            parent.write(1, network.base_weight * 2)
+            parent.write(2, slow)
+        return calculate(*args)
+
+    monkeypatch.setattr(engine, '_calculate_routes', calculate_during_updates)
+    monkeypatch.setattr(route_recommendation, '_batch_engine', engine)
+    names = list(engine.location_nodes)
+    try:
+        routes = route_recommendation._route_batch_request((names[0], names[4], 'car', None), 2)
+        assert epochs == [0, 2]
+        assert routes and np.array_equal(engine.snapshot.weight, slow)
+    finally:
+        engine.shared_graphs['drive'].close()
+        parent.close()
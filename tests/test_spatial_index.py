@@ -0,0 +1,23 @@
+import numpy as np
+from spatial_index import GridIndex
+
+
+def test_grid_index_matches_brute_force(graph):
+    rng = np.random.default_rng(5)
+    lats = rng.uniform(graph.y.min() - 0.003, graph.y.max() + 0.003, 300)
+    lons = rng.uniform(graph.x.min() - 0.003, graph.x.max() + 0.003, 300)
+    nodes, dist = graph.nearest_nodes(lats, lons)
+    candidates = graph.spatial_index().cell_nodes
+    qx, qy = graph.project(lats, lons)
+    brute = np.hypot(graph.px[candidates][None, :] - qx[:, None], graph.py[candidates][None, :] - qy[:, None])
+    assert np.allclose(dist, brute.min(axis=1))
+    assert np.allclose(np.hypot(graph.px[nodes] - qx, graph.py[nodes] - qy), dist)
+
+
+def test_grid_index_round_trips_and_rejects_other_graphs(graph, tmp_path):
+    index = graph.spatial_index()
+    index.save(tmp_path)
+    loaded = GridIndex.load(tmp_path, graph.px, graph.py, graph.signature())
+    assert loaded is not None
+    assert np.array_equal(loaded.cell_nodes, index.cell_nodes)
+    assert GridIndex.load(tmp_path, graph.px, graph.py, graph.signature() + 1) is None
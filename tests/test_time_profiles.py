@@ -0,0 +1,63 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+import route_recommendation
+from time_profiles import TimeProfiles
+
+
+class FixedClock(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 3, 2, 8, 30)
+
+
+def test_learned_factors_match_hand_computed_values(engine, tmp_path):
+    network = engine.road_network
+    location = list(engine.location_nodes)[0]
+    edges = engine.location_edges[location]
+    history = pd.DataFrame({
+        'timestamp': pd.to_datetime(['2026-03-02 08:10', '2026-03-02 08:40', '2026-03-02 03:15']),
+        'location': [location] * 3,
+        'congestion_ratio': [0.4, 0.6, 0.0],
+        'avg_speed': [20.0, 20.0, 80.0],
+    })
+    profiles = engine.learn_time_profiles(history)
+    # 08:xx: (1 + rata-rata 0.5) x (batas 40 km/j / 20 km/j) = 3.0; 03:xx: (1 + 0) x max(0.5, 40 / 80) = 0.5
+    assert np.allclose(profiles.factors[edges, 8], 3.0)
+    assert np.allclose(profiles.factors[edges, 3], 0.5)
+    others = np.setdiff1d(np.arange(network.num_edges), edges)
+    assert np.allclose(profiles.factors[others, 8], 1.5) and np.allclose(profiles.factors[others, 3], 1.0)
+
+    loaded = TimeProfiles.load(route_recommendation.RouteRecommendationEngine.TIME_PROFILE_FILE, network)
+    assert loaded is not None and np.array_equal(loaded.factors, profiles.factors)
+
+
+def test_eta_evaluates_each_edge_in_its_entry_bucket(engine):
+    network = engine.road_network
+    factors = np.ones((network.num_edges, 24), dtype=np.float32)
+    factors[:, 9] = 2.0
+    engine.time_profiles = TimeProfiles(factors, 60, network.signature())
+    engine.snapshot = engine._make_snapshot(engine.snapshot.epoch, engine.snapshot.weight)  # tanpa data live
+    nodes, edges, _ = network.shortest_path(0, 5)
+    m0, m1 = engine._edge_times(network, edges[:2], weight=network.base_weight)
+    # Berangkat setengah edge pertama sebelum 09:00: edge pertama x1, edge kedua masuk jam 9 (x2)
+    seconds = int(m0 * 30)
+    departure = datetime(2026, 3, 2, 8, 59, 60 - seconds) if seconds else datetime(2026, 3, 2, 9, 0)
+    assert engine._path_time(network, edges[:2], departure) == pytest.approx(m0 + 2 * m1)
+
+
+def test_live_traffic_overrides_the_current_bucket(engine, monkeypatch):
+    monkeypatch.setattr(route_recommendation, 'datetime', FixedClock)
+    network = engine.road_network
+    engine.time_profiles = TimeProfiles(np.ones((network.num_edges, 24), dtype=np.float32), 60, network.signature())
+    location = list(engine.location_nodes)[1]
+    engine.update_traffic_conditions(pd.DataFrame({'location': [location], 'congestion_ratio': [1.0],
+                                                   'avg_speed': [10.0]}))
+    edge = int(engine.location_edges[location][0])
+    live = engine.snapshot.weight[edge] / network.base_weight[edge]
+    assert live == pytest.approx(8.0)  # (1 + 1.0) x 40 / 10
+    minutes = float(engine._edge_times(network, edge, weight=network.base_weight))
+    edges = np.array([edge])
+    assert engine._path_time(network, edges, '08:45') == pytest.approx(minutes * live)
+    assert engine._path_time(network, edges, '10:45') == pytest.approx(minutes)
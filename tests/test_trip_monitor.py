@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from trip_monitor import TripMonitor
+
+
+def publish(engine, weight):
+    """Publish a new snapshot the way update_traffic_conditions does, with the changed edges recorded"""
+    previous = engine.snapshot
+    engine.snapshot = engine._make_snapshot(previous.epoch + 1, weight, np.zeros(len(weight), dtype=np.float32),
+                                            changed=np.flatnonzero(weight != previous.weight))
+    engine.road_network.weight = engine.snapshot.weight
+
+
+def slowed(engine, edges, factor=6.0):
+    weight = engine.snapshot.weight.copy()
+    weight[edges] *= factor
+    return weight
+
+
+@pytest.fixture
+def names(engine):
+    return list(engine.location_nodes)
+
+
+def test_degraded_trip_is_replanned_and_notified(engine, names):
+    notified = []
+    monitor = TripMonitor(engine, on_reroute=lambda trip, old: notified.append(('monitor', trip.trip_id)))
+    trip_id = monitor.register(names[0], names[5], callback=lambda trip, old: notified.append(('trip', old)))
+    trip = monitor.trips[trip_id]
+    old_route, old_cost = trip.route, trip.cost
+    publish(engine, slowed(engine, old_route.edges[1:-1]))
+
+    assert monitor.refresh() == [trip_id]
+    assert trip.version == 2 and trip.epoch == engine.snapshot.epoch
+    assert not np.array_equal(trip.route.nodes, old_route.nodes)
+    assert trip.cost < TripMonitor._route_cost(old_route, engine.snapshot)
+    assert trip.cost >= old_cost - 1e-9
+    assert notified == [('trip', old_route), ('monitor', trip_id)]
+    assert monitor.stats == {'checked': 1, 'replanned': 1, 'rerouted': 1}
+
+
+def test_unaffected_trip_is_not_replanned(engine, names):
+    monitor = TripMonitor(engine)
+    hit = monitor.register(names[0], names[5])
+    other = monitor.register(names[7], names[8])
+    untouched = np.setdiff1d(monitor.trips[hit].route.edges[1:-1], monitor.trips[other].route.edges)
+    publish(engine, slowed(engine, untouched))
+
+    assert monitor.refresh() == [hit]
+    assert monitor.trips[other].version == 1
+    assert monitor.stats['checked'] == 1
+    assert monitor.refresh() == []  # Epoch yang sama tidak dicek ulang
+
+
+def test_missed_epochs_fall_back_to_a_full_diff(engine, names):
+    monitor = TripMonitor(engine)
+    trip_id = monitor.register(names[0], names[5])
+    edges = monitor.trips[trip_id].route.edges[1:-1]
+    publish(engine, slowed(engine, edges))
+    publish(engine, engine.snapshot.weight.copy())  # Update kedua tanpa perubahan: changed kosong
+    assert len(engine.snapshot.changed) == 0
+    assert monitor.refresh() == [trip_id]
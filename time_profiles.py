@@ -0,0 +1,56 @@
+import logging
+import os
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class TimeProfiles:
+    """Per-edge travel-time profiles over the day.
+
+    factors[e, b] multiplies the free-flow travel time of edge e for departures inside time
+    bucket b, so the whole table is one (edges x buckets) float32 array.
+    """
+
+    RUSH_HOURS = ((7, 9), (17, 19))  # Jam sibuk yang dipakai get_historical_factor (faktor 1.5)
+
+    def __init__(self, factors, bucket_minutes=60, signature=0):
+        self.factors = np.asarray(factors, dtype=np.float32)
+        self.bucket_minutes = int(bucket_minutes)
+        self.signature = int(signature)
+        self.min_factor = self.factors.min(axis=1).astype(np.float64)
+
+    @property
+    def num_buckets(self):
+        return self.factors.shape[1]
+
+    @classmethod
+    def default_row(cls, bucket_minutes=60, rush_factor=1.5):
+        """Flat rush-hour profile, used for edges without traffic history"""
+        hours = np.arange(0, MINUTES_PER_DAY, bucket_minutes) / 60
+        row = np.ones(len(hours), dtype=np.float32)
+        for start, end in cls.RUSH_HOURS:
+            row[(hours >= start) & (hours < end)] = rush_factor
+        return row
+
+    def bucket(self, minute_of_day):
+        return int(minute_of_day % MINUTES_PER_DAY) // self.bucket_minutes
+
+    def save(self, path):
+        np.savez(path, factors=self.factors, bucket_minutes=self.bucket_minutes, signature=np.int64(self.signature))
+        logging.info(f"✅ Profil waktu tempuh disimpan ke {path}")
+
+    @classmethod
+    def load(cls, path, graph):
+        """Load saved profiles; returns None if they were learned on a different graph"""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['signature']) != graph.signature() or data['factors'].shape[0] != graph.num_edges:
+                logging.warning(f"⚠ {path} tidak cocok dengan graf saat ini, profil perlu dipelajari ulang")
+                return None
+            profiles = cls(data['factors'], int(data['bucket_minutes']), int(data['signature']))
+        logging.info(f"✅ Loaded travel-time profiles from {path}")
+        return profiles
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+class TrafficSnapshot:
+    """Read-only road traffic state for one epoch.
+
+    update_traffic_conditions builds a complete new snapshot and publishes it with a single
+    reference swap, so a query that pins engine.snapshot once sees consistent weights,
+    congestion and CH arc weights for its whole lifetime, however many updates land meanwhile.
+    changed lists the edges whose weight differs from the snapshot of epoch - 1 (None if unknown).
+    """
+
+    __slots__ = ('epoch', 'weight', 'congestion', 'traffic', 'ch_weight', 'changed')
+
+    def __init__(self, epoch, weight, congestion=None, traffic=None, ch_weight=None, changed=None):
+        self.epoch = epoch
+        self.weight = self._frozen(weight)
+        self.congestion = self._frozen(congestion)  # congestion_ratio per edge; NaN = tidak teramati
+        self.traffic = traffic  # DataFrame snapshot asal, untuk pembaca lama (current_traffic)
+        # (bobot arc, edge asli per arc) dari ContractionHierarchy.weights_for
+        self.ch_weight = tuple(self._frozen(a) for a in ch_weight) if ch_weight is not None else None
+        self.changed = self._frozen(changed)
+
+    @staticmethod
+    def _frozen(array):
+        if array is None:
+            return None
+        array = np.asarray(array)
+        if array.flags.writeable:
+            array.flags.writeable = False
+        return array
@@ -0,0 +1,136 @@
+import itertools
+import logging
+import threading
+import numpy as np
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ActiveTrip:
+    """A registered trip: its current alternatives and the planned cost of the route it follows"""
+
+    def __init__(self, trip_id, start, end, mode, departure_time, max_alternatives, callback):
+        self.trip_id = trip_id
+        self.start = start
+        self.end = end
+        self.mode = mode
+        self.departure_time = departure_time
+        self.max_alternatives = max_alternatives
+        self.callback = callback
+        self.routes = []  # Terurut menurut jarak, seperti hasil get_alternative_routes
+        self.route = None  # Rute utama yang diikuti: bobot terendah di antara routes
+        self.cost = None  # Bobot rute utama saat terakhir direncanakan
+        self.epoch = None
+        self.version = 0  # Naik setiap kali rute direncanakan ulang
+
+
+class TripMonitor:
+    """Registry of active trips that only re-plans the trips a traffic update actually hits.
+
+    An inverted index maps each road edge to the trips whose current route uses it. refresh()
+    looks up the edges the engine recorded as changed on the new snapshot (a full diff only when
+    it missed epochs) and re-prices only the routes that use them. A trip is re-planned when its cost has grown
+    past threshold (relative to the cost when it was planned); callbacks fire when the new
+    plan is a different, cheaper route.
+    """
+
+    def __init__(self, route_engine, threshold=0.15, on_reroute=None):
+        self.route_engine = route_engine
+        self.threshold = threshold
+        self.on_reroute = on_reroute  # callback(trip, old_route) untuk semua trip
+        self.trips = {}
+        self._edge_trips = {}  # indeks edge jalan -> set trip_id
+        self._snapshot = route_engine.snapshot
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self.stats = {'checked': 0, 'replanned': 0, 'rerouted': 0}
+
+    def register(self, start, end, mode='car', departure_time=None, max_alternatives=3, callback=None):
+        """Plan a trip and start watching it; returns its id"""
+        with self._lock:
+            trip = ActiveTrip(next(self._ids), start, end, mode, departure_time, max_alternatives, callback)
+            self.trips[trip.trip_id] = trip
+            self._plan(trip, self.route_engine.snapshot)
+            return trip.trip_id
+
+    def unregister(self, trip_id):
+        with self._lock:
+            trip = self.trips.pop(trip_id, None)
+            if trip is not None:
+                self._unindex(trip)
+
+    def routes(self, trip_id):
+        return self.trips[trip_id].routes
+
+    def _plan(self, trip, snapshot):
+        routes = self.route_engine.get_alternative_routes(trip.start, trip.end, trip.departure_time,
+                                                          trip.max_alternatives, mode=trip.mode)
+        self._unindex(trip)
+        trip.routes = routes or []
+        # Alternatif diurutkan menurut jarak; rute yang diikuti adalah yang termurah menurut bobot pencarian
+        trip.route = min(trip.routes, key=lambda route: self._route_cost(route, snapshot)) if trip.routes else None
+        trip.cost = self._route_cost(trip.route, snapshot) if trip.route is not None else None
+        trip.epoch = snapshot.epoch
+        trip.version += 1
+        # Jaringan jalan kaki tidak terpengaruh traffic, jadi trip jalan kaki tidak diindeks
+        if trip.route is not None and trip.mode != 'walking':
+            for edge in trip.route.edges.tolist():
+                self._edge_trips.setdefault(edge, set()).add(trip.trip_id)
+
+    @staticmethod
+    def _route_cost(route, snapshot):
+        """Weight of a route under the weights its search used: traffic for roads, static for walking"""
+        weight = route.network.weight if route.mode == 'walking' else snapshot.weight
+        return float(weight[route.edges].sum())
+
+    def _unindex(self, trip):
+        if trip.route is None or trip.mode == 'walking':
+            return
+        for edge in trip.route.edges.tolist():
+            trips = self._edge_trips.get(edge)
+            if trips is not None:
+                trips.discard(trip.trip_id)
+                if not trips:
+                    del self._edge_trips[edge]
+
+    def refresh(self):
+        """Check trips against the edges changed since the last refresh; returns the re-planned trip ids"""
+        with self._lock:
+            snapshot = self.route_engine.snapshot
+            previous, self._snapshot = self._snapshot, snapshot
+            if previous is None or snapshot.epoch == previous.epoch:
+                return []
+            if snapshot.epoch == previous.epoch + 1 and snapshot.changed is not None:
+                changed = snapshot.changed
+            else:  # Beberapa update terlewat: bandingkan langsung dengan snapshot terakhir yang dilihat
+                changed = np.flatnonzero(snapshot.weight != previous.weight)
+            affected = set()
+            for edge in changed.tolist():
+                affected.update(self._edge_trips.get(edge, ()))
+
+            replanned = []
+            for trip_id in sorted(affected):
+                trip = self.trips[trip_id]
+                self.stats['checked'] += 1
+                cost = self._route_cost(trip.route, snapshot)
+                if cost <= trip.cost * (1 + self.threshold):
+                    continue
+                old_route = trip.route
+                self._plan(trip, snapshot)
+                self.stats['replanned'] += 1
+                replanned.append(trip_id)
+                if trip.route is not None and trip.cost < cost and not np.array_equal(trip.route.nodes, old_route.nodes):
+                    self.stats['rerouted'] += 1
+                    logging.info(f"🔀 Rute lebih baik untuk {trip.start} → {trip.end} ({trip.mode}): "
+                                 f"biaya {cost:.2f} → {trip.cost:.2f}")
+                    self._notify(trip, old_route)
+            return replanned
+
+    def _notify(self, trip, old_route):
+        for callback in (trip.callback, self.on_reroute):
+            if callback is None:
+                continue
+            try:
+                callback(trip, old_route)
+            except Exception as e:
+                logging.error(f"❌ Error pada callback rute ulang trip {trip.trip_id}: {str(e)}")
@@ -9,6 +9,8 @@ import datetime
 import folium
 import plotly.graph_objects as go
 import logging
+from collections import deque
+from trip_monitor import TripMonitor
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -313,6 +315,13 @@ class RealTimeMonitoringDashboard:
             ('Simpang Lima', 'Kantor Gubernur Bengkulu'),
             ('RSUD Dr. M. Yunus', 'Pasar Barukoto'),
         ]
+        # Rute yang ditampilkan didaftarkan sebagai trip aktif; hanya trip yang terkena update dihitung ulang
+        self.trip_monitor = TripMonitor(route_engine, on_reroute=self._on_reroute)
+        self.trip_ids = {}  # (start, dest, mode) -> trip_id
+        self.map_versions = {}  # trip_id -> versi rute yang petanya sudah dibuat
+        self.map_files = {}  # (trip_id, indeks rute) -> path peta dari create_route_map
+        self._custom_trip_key = None  # (start, dest, mode) rute kustom yang sedang didaftarkan
+        self.reroute_notices = deque(maxlen=5)  # Hanya pemberitahuan terakhir yang ditampilkan
 
     def start_monitoring(self, interval_seconds=5):
         try:
@@ -348,6 +357,7 @@ class RealTimeMonitoringDashboard:
                 if not current_traffic.empty:
                     self.current_data = current_traffic
                     self.route_engine.update_traffic_conditions(current_traffic)
+                    self.trip_monitor.refresh()
                     self._display_dashboard()
                     logging.info(f"✅ Data lalu lintas diperbarui pada {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
                 else:
@@ -358,6 +368,29 @@ class RealTimeMonitoringDashboard:
                 self.monitoring_active = False
                 break
 
+    def _trip_for(self, start, dest, mode):
+        key = (start, dest, mode)
+        if key not in self.trip_ids:
+            self.trip_ids[key] = self.trip_monitor.register(start, dest, mode)
+        return self.trip_ids[key]
+
+    def _release_trip(self, key):
+        """Stop watching a trip the dashboard no longer shows"""
+        trip_id = self.trip_ids.pop(key, None)
+        if trip_id is None:
+            return
+        self.trip_monitor.unregister(trip_id)
+        self.map_versions.pop(trip_id, None)
+        for map_key in [k for k in self.map_files if k[0] == trip_id]:
+            del self.map_files[map_key]
+
+    def _on_reroute(self, trip, old_route):
+        new_route = trip.route
+        self.reroute_notices.append(
+            f"{datetime.datetime.now().strftime('%H:%M:%S')} {trip.start} → {trip.end} ({trip.mode}): "
+            f"{old_route['total_distance']:.2f} km → {new_route['total_distance']:.2f} km, "
+            f"estimasi {new_route['estimated_time']:.1f} menit")
+
     def _display_dashboard(self):
         if self.current_data is None or self.current_data.empty:
             logging.error("❌ Tidak ada data untuk dashboard")
@@ -418,10 +451,20 @@ class RealTimeMonitoringDashboard:
         if self.custom_route:
             routes_to_display.append(self.custom_route)
         routes_to_display.extend([(s, e, 'car') for s, e in self.sample_routes])
+        # Trip rute kustom lama tidak dipantau lagi setelah rute kustom diganti
+        previous = self._custom_trip_key
+        if previous is not None and previous != self.custom_route and previous not in routes_to_display:
+            self._release_trip(previous)
+        self._custom_trip_key = self.custom_route
 
         for start, dest, mode in routes_to_display:
             print(f"\n🚗 Rute dari {start} ke {dest} ({mode}):")
-            routes = self.route_engine.get_alternative_routes(start, dest, max_alternatives=3)
+            trip_id = self._trip_for(start, dest, mode)
+            routes = self.trip_monitor.routes(trip_id)
+            # Peta hanya dibuat ulang bila rute trip berubah sejak tick sebelumnya
+            version = self.trip_monitor.trips[trip_id].version
+            refresh_maps = self.map_versions.get(trip_id) != version
+            self.map_versions[trip_id] = version
             if routes:
                 for idx, route in enumerate([r for r in routes if r['mode'] == mode], 1):
                     quality_icon = "🟢" if route['route_quality'] == 'Good' else "🟡" if route['route_quality'] == 'Fair' else "🔴"
@@ -432,7 +475,10 @@ class RealTimeMonitoringDashboard:
                     print(f"   ⭐ Kualitas Rute: {route['route_quality']}")
 
                     map_filename = f"peta_rute_{start.lower().replace(' ', '_')}_ke_{dest.lower().replace(' ', '_')}_{mode}_{idx}.html"
-                    map_file = self.route_engine.create_route_map(route, map_filename)
+                    map_file = self.map_files.get((trip_id, idx))
+                    if refresh_maps or not map_file or not os.path.exists(map_file):
+                        map_file = self.route_engine.create_route_map(route, map_filename)
+                        self.map_files[(trip_id, idx)] = map_file
                     if map_file and os.path.exists(map_file):
                         print(f"   🗺 Peta Interaktif: Buka '{map_file}' di browser untuk melihat rute.")
                         print(f"   📂 Lokasi file: {os.path.abspath(map_file)}")
@@ -441,5 +487,20 @@ class RealTimeMonitoringDashboard:
             else:
                 print(f"❌ Tidak ditemukan rute: {start} → {dest} via {mode}")
 
+        if self.reroute_notices:
+            print("\n🔀 Pengalihan Rute")
+            print("-" * 70)
+            for notice in self.reroute_notices:
+                print(notice)
+
+        stats = self.trip_monitor.stats
+        print(f"\n🧭 Trip Aktif: {len(self.trip_monitor.trips)}, {stats['checked']} dicek, "
+              f"{stats['replanned']} dihitung ulang, {stats['rerouted']} dialihkan")
+
+        if hasattr(self.route_engine, 'route_cache'):
+            stats = self.route_engine.route_cache.stats()
+            print(f"\n💾 Cache Rute: {stats['hits'] + stats['persistent_hits']} hit, {stats['misses']} miss "
+                  f"({stats['hit_rate']:.0%}), {stats['size']} entri")
+
         print("\n" + "=" * 70)
         print("ℹ Tekan Ctrl+C untuk menghentikan pemantauan atau masukkan rute kustom baru pada pembaruan berikutnya")
\ No newline at end of file